@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+
+import pandas as pd
+
+from benchmark.run import benchmark, save
+
+
+if __name__ == "__main__":
+
+    # ---------------------- Parse Arguments ---------------------------- #
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Benchmark of the Speed-Acceleration Profiling on synthetic GPS data")
+
+    parser.add_argument("--players", type=int, nargs='+', default=[4, 16], help="Numbers of players.")
+    parser.add_argument("--sessions", type=int, nargs='+', default=[1, 5], help="Numbers of sessions (one per day).")
+    parser.add_argument("--rates", type=float, nargs='+', default=[10, 18], help="Sampling rates (Hz).")
+    parser.add_argument("--duration", type=float, default=3600, help="Duration of a session (s).")
+    parser.add_argument("--dbscan_engines", type=str, nargs='+', default=['sklearn', 'grid'], choices=['sklearn', 'grid'])
+    parser.add_argument("--quantile_engines", type=str, nargs='+', default=['exact'], choices=['exact', 'statsmodels'])
+    parser.add_argument("--repeat", type=int, default=1, help="Timings are the best of repeat runs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=str, default="results/benchmark.json", help="JSON file of the results.")
+
+    args = parser.parse_args()
+
+    # -------------------- Benchmark -------------------- #
+
+    # Mesures écrites après chaque combinaison : une combinaison en échec ne perd pas les autres
+    records = benchmark(args.players, args.sessions, args.rates, args.dbscan_engines, args.quantile_engines, args.duration, args.repeat, args.seed, path = args.output)
+    save(records, args.output)
+
+    # Résumé
+    results = pd.DataFrame(records)
+    keys = ['players', 'sessions', 'rate', 'dbscan_engine', 'quantile_engine']
+    stages = results[~results.stage.isin(['accuracy', 'error'])]
+    if not stages.empty :
+        print(stages.pivot_table(index = keys, columns = 'stage', values = 'wall_time', sort = False).round(3).to_string())
+        print(stages.pivot_table(index = keys, columns = 'stage', values = 'peak_memory', sort = False).round(1).to_string())
+        print(results[results.stage == 'accuracy'].set_index(keys)[['a0_error_quantile', 's0_error_quantile', 'misuse_detected', 'misuse_injected']].round(3).to_string())
+    if (results.stage == 'error').any() :
+        print(results[results.stage == 'error'].set_index(keys)[['error']].to_string())
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+
+def sprint_profile(rng : np.random.Generator) -> tuple:
+    """Profil accélération-vitesse (a0, s0) plausible pour un joueur."""
+    return rng.uniform(5, 8), rng.uniform(8, 10)
+
+
+def generate_trace(rng : np.random.Generator, a0 : float, s0 : float, duration : float = 3600, rate : float = 10, n_sprints : int = 30, noise : float = 0.15) -> np.ndarray:
+    """Vitesse (m/s) d'une séance : footing aléatoire entre 0 et 4 m/s et sprints suivant le modèle mono-exponentiel
+    a = f * (a0 - a0/s0 * v), avec f ≤ 1 l'intensité du sprint (f = 1 : effort maximal, sur la droite du profil).
+    `noise` : écart-type (m/s²) du bruit sur l'accélération dérivée, identique quelle que soit la fréquence."""
+    n = int(duration * rate)
+
+    # Footing : marche aléatoire lissée
+    steps = rng.normal(0, 0.05, n)
+    jog = np.convolve(np.cumsum(steps), np.ones(int(rate)) / int(rate), mode = 'same')
+    jog = jog - jog.min()
+    speed = 0.5 + jog / max(jog.max(), 1e-9) * rng.uniform(1.5, 3.5)
+
+    # Sprints
+    starts = np.sort(rng.choice(n - int(15 * rate), size = min(n_sprints, n // int(15 * rate)), replace = False))
+    for start in starts :
+        effort = rng.uniform(0.7, 1.0)
+        t = np.arange(int(rng.uniform(2, 6) * rate)) / rate
+        v_start = speed[start]
+        sprint = s0 - (s0 - v_start) * np.exp(- effort * a0 / s0 * t)
+        # Décélération jusqu'au footing
+        slow_down = sprint[-1] - rng.uniform(2, 4) * np.arange(1, int(4 * rate)) / rate
+        stop = min(start + len(sprint) + len(slow_down), n)
+        block = np.concatenate([sprint, slow_down])[:stop - start]
+        speed[start:stop] = np.maximum(block, speed[start:stop])
+
+    return np.maximum(speed + rng.normal(0, noise / (np.sqrt(2) * rate), n), 0)
+
+
+def inject_measurement_errors(rng : np.random.Generator, speed : np.ndarray, n_errors : int) -> np.ndarray:
+    """Pics de vitesse isolés sur un échantillon (perte de signal GPS)."""
+    index = rng.choice(len(speed), size = n_errors, replace = False)
+    speed[index] += rng.uniform(2, 8, n_errors)
+    return index
+
+
+def inject_misuse(rng : np.random.Generator, speed : np.ndarray, rate : float, length : int = 40) -> np.ndarray:
+    """Boîtier secoué ou mal porté : vitesse qui oscille d'un échantillon à l'autre à basse vitesse,
+    d'où une salve d'accélérations au-dessus de la droite de mauvaise utilisation."""
+    start = rng.integers(0, len(speed) - length)
+    index = np.arange(start, start + length)
+    speed[index] = np.where(index % 2 == 0, 0., 15 / rate)
+    return index
+
+
+def generate_season(n_players : int = 4, n_sessions : int = 3, rate : float = 10, duration : float = 3600, misuse_rate : float = 0.02, errors_per_session : int = 2, seed : int = 0) -> tuple:
+    """Saison synthétique : une séance de `duration` secondes par joueur et par jour, échantillonnée à `rate` Hz.
+
+    Retourne (session, truth) :
+        - session : colonnes Player, Timestamp, Speed (m/s), Date, triées par joueur puis horodatage ;
+        - truth : DataFrame indexé par Player avec a0, s0 et les dates de mauvaise utilisation injectées."""
+    rng = np.random.default_rng(seed)
+    frames, truth = [], []
+    for k in range(n_players) :
+        player = f"Player_{k:03d}"
+        a0, s0 = sprint_profile(rng)
+        misuse_dates = []
+        for day in range(n_sessions) :
+            speed = generate_trace(rng, a0, s0, duration, rate)
+            inject_measurement_errors(rng, speed, errors_per_session)
+            date = (pd.Timestamp('2023-09-01') + pd.Timedelta(days = day)).date()
+            if rng.random() < misuse_rate :
+                inject_misuse(rng, speed, rate)
+                misuse_dates.append(date)
+
+            start = pd.Timestamp(date) + pd.Timedelta(hours = 10)
+            frames.append(pd.DataFrame({
+                'Player' : player,
+                'Timestamp' : start + pd.to_timedelta(np.arange(len(speed)) / rate, unit = 's'),
+                'Speed' : speed,
+                'Date' : date,
+            }))
+        truth.append({'Player' : player, 'a0' : a0, 's0' : s0, 'misuse_dates' : misuse_dates})
+
+    session = pd.concat(frames, ignore_index = True)
+    return session, pd.DataFrame(truth).set_index('Player')
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import platform
+import itertools
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from derivation import derive_acceleration
+from outliers import Outliers
+from regression import Regression
+from benchmark.generator import generate_season
+
+STAGES = ['derivation', 'misuse_error_identification', 'measurement_error_identification', 'intensity_max_identification', 'regression_lineaire', 'regression_quantile']
+
+
+def pipeline(session : pd.DataFrame, dbscan_engine : str = 'sklearn', quantile_engine : str = 'exact'):
+    """Étapes du profilage (cf main.py), générées une à une pour pouvoir les mesurer séparément."""
+    session = session.copy()
+    state = {}
+
+    session['Acceleration'] = derive_acceleration(session.Speed.to_numpy(), pd.DatetimeIndex(session.Timestamp).asi8, session.Player.to_numpy())
+    yield 'derivation'
+
+    state['outliers'] = Outliers(session, dbscan_engine = dbscan_engine)
+    state['outliers'].misuse_error_identification()
+    yield 'misuse_error_identification'
+
+    state['outliers'].measurement_error_identification()
+    yield 'measurement_error_identification'
+
+    state['regression'] = Regression(state['outliers'].correct_selection, quantile_engine = quantile_engine)
+    state['regression'].intensity_max_identification()
+    yield 'intensity_max_identification'
+
+    state['regression'].regression_lineaire()
+    yield 'regression_lineaire'
+
+    state['regression'].regression_quantile()
+    yield 'regression_quantile'
+
+    return state
+
+
+def timings(session : pd.DataFrame, repeat : int = 1, **engines) -> dict:
+    """Temps (s) de chaque étape, meilleur de `repeat` exécutions."""
+    best = {stage : np.inf for stage in STAGES}
+    for _ in range(repeat) :
+        start = time.perf_counter()
+        for stage in pipeline(session, **engines) :
+            end = time.perf_counter()
+            best[stage] = min(best[stage], end - start)
+            start = time.perf_counter()
+    return best
+
+
+def peak_memory(session : pd.DataFrame, **engines) -> tuple:
+    """Pic de mémoire (Mo) alloué pendant chaque étape, mesuré avec tracemalloc (passe séparée des temps),
+    et pic de tout le pipeline ('total'), qui compte aussi les copies conservées d'une étape à l'autre.
+    Retourne aussi l'état final du pipeline pour l'évaluation de la précision."""
+    peaks = {}
+    steps = pipeline(session, **engines)
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    total = 0
+    try :
+        while True :
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            stage = next(steps)
+            peak = tracemalloc.get_traced_memory()[1]
+            peaks[stage] = (peak - current) / 2**20
+            total = max(total, peak - start)
+    except StopIteration as end :
+        state = end.value
+    finally :
+        tracemalloc.stop()
+    peaks['total'] = total / 2**20
+    return peaks, state
+
+
+def accuracy(state : dict, truth : pd.DataFrame) -> dict:
+    """Écart aux profils et aux dates de mauvaise utilisation injectés."""
+    regression, outliers = state['regression'], state['outliers']
+    # Sans profil (ex : toutes les dates supprimées par la règle de mauvaise utilisation), les erreurs valent NaN
+    profiles = pd.concat([regression.players_linear_regression, regression.compute_quantile_a0_s0()], axis = 1).reindex(truth.index)
+
+    injected = {(player, date) for player, dates in truth.misuse_dates.items() for date in dates}
+    detected = set() if outliers.misuse_error.empty else set(zip(outliers.misuse_error.Player, outliers.misuse_error.Date))
+    return {
+        'a0_error_linear' : float((profiles["a0 : Regression linéaire"] - truth.a0).abs().mean()),
+        's0_error_linear' : float((profiles["s0 : Regression linéaire"] - truth.s0).abs().mean()),
+        'a0_error_quantile' : float((profiles["a0 : Regression quantile"] - truth.a0).abs().mean()),
+        's0_error_quantile' : float((profiles["s0 : Regression quantile"] - truth.s0).abs().mean()),
+        'misuse_injected' : len(injected),
+        'misuse_detected' : len(injected & detected),
+        'misuse_false_alarms' : len(detected - injected),
+    }
+
+
+def environment() -> dict:
+    """Versions du code et des dépendances, pour comparer les résultats d'une version à l'autre."""
+    import sklearn, statsmodels
+    try :
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output = True, text = True, cwd = os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError :
+        commit = None
+    return {
+        'commit' : commit, 'python' : platform.python_version(), 'platform' : platform.platform(), 'cpu_count' : os.cpu_count(),
+        'numpy' : np.__version__, 'pandas' : pd.__version__, 'scikit-learn' : sklearn.__version__, 'statsmodels' : statsmodels.__version__,
+    }
+
+
+def benchmark(players : list, sessions : list, rates : list, dbscan_engines : list = ('sklearn',), quantile_engines : list = ('exact',), duration : float = 3600, repeat : int = 1, seed : int = 0, path : str = None) -> list:
+    """Mesures pour chaque combinaison joueurs × séances × fréquence × moteurs : une ligne par étape, plus une ligne de précision.
+    Une combinaison en échec est enregistrée (ligne 'error') sans interrompre les autres ; avec `path`, les mesures sont écrites après chaque combinaison."""
+    records = []
+    for n_players, n_sessions, rate in itertools.product(players, sessions, rates) :
+        session, truth = generate_season(n_players, n_sessions, rate, duration = duration, seed = seed)
+        for dbscan_engine, quantile_engine in itertools.product(dbscan_engines, quantile_engines) :
+            engines = {'dbscan_engine' : dbscan_engine, 'quantile_engine' : quantile_engine}
+            config = {'players' : n_players, 'sessions' : n_sessions, 'rate' : rate, 'n_samples' : len(session), **engines}
+
+            try :
+                wall_times = timings(session, repeat, **engines)
+                peaks, state = peak_memory(session, **engines)
+                results = [{**config, 'stage' : stage, 'wall_time' : wall_times[stage], 'peak_memory' : peaks[stage]} for stage in STAGES]
+                results.append({**config, 'stage' : 'total', 'wall_time' : sum(wall_times.values()), 'peak_memory' : peaks['total']})
+                results.append({**config, 'stage' : 'accuracy', **accuracy(state, truth)})
+            except Exception as error :
+                results = [{**config, 'stage' : 'error', 'error' : f"{type(error).__name__}: {error}"}]
+            records.extend(results)
+            if path :
+                save(records, path)
+    return records
+
+
+def save(records : list, path : str) -> None:
+    """Écrit les mesures et l'environnement en JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+    with open(path, 'w') as f :
+        json.dump({'date' : time.strftime('%Y-%m-%dT%H:%M:%S'), 'environment' : environment(), 'records' : records}, f, indent = 1)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Bibliothèques qui ne doivent être chargées que par les étapes qui les utilisent
+HEAVY = ['sklearn', 'statsmodels', 'patsy', 'matplotlib', 'scipy']
+
+# Scénarios de démarrage : code exécuté dans un interpréteur neuf, depuis la racine du dépôt (comme main.py)
+SCENARIOS = {
+    # Aide de la ligne de commande
+    'help' : "import runpy, sys; sys.argv = ['main.py', '--help']\ntry :\n    runpy.run_path('main.py', run_name = '__main__')\nexcept SystemExit :\n    pass",
+    # Imports du chemin principal de main.py, avant toute étape
+    'pipeline' : "import sys, os; sys.path.insert(0, os.getcwd() + '/code')\nfrom code.loading import load_session\nfrom code.instrumentation import Report\nfrom code.outliers import Outliers\nfrom code.regression import Regression\nfrom code.pipeline import run\nfrom code.store import ProfileStore",
+}
+
+# Temps maximal (s) de chaque scénario
+BUDGET = {'help' : 0.15, 'pipeline' : 0.8}
+
+
+def measure(code : str) -> tuple:
+    """Temps (s) de démarrage d'un interpréteur exécutant `code` et bibliothèques lourdes chargées."""
+    probe = (
+        "import time\n_start = time.perf_counter()\n" + code + "\n"
+        "import sys, json\n"
+        f"print(json.dumps({{'time' : time.perf_counter() - _start, 'heavy' : sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r}))}}))"
+    )
+    output = subprocess.run([sys.executable, '-c', probe], cwd = ROOT, capture_output = True, text = True, check = True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['time'], result['heavy']
+
+
+def startup(repeat : int = 5) -> dict:
+    """Meilleur temps de `repeat` démarrages de chaque scénario (le premier lancement, qui remplit les caches de fichiers, est ignoré)."""
+    results = {}
+    for name, code in SCENARIOS.items() :
+        measure(code)
+        times, heavy = [], []
+        for _ in range(repeat) :
+            time, heavy = measure(code)
+            times.append(time)
+        results[name] = {'time' : min(times), 'heavy' : heavy}
+    return results
+
+
+if __name__ == "__main__":
+
+    # Rapport seulement : le budget et l'absence de bibliothèques lourdes sont vérifiés par tests/test_startup.py
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark.startup",
+        description="Startup time of the command line tool, compared with its budget")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, result in startup(args.repeat).items() :
+        print(f"{name:<10} {result['time']:.3f} s (budget {BUDGET[name]:.3f} s)  heavy imports : {', '.join(result['heavy']) or '-'}")
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+from derivation import derive_acceleration
+from store import ProfileStore
+from benchmark.generator import generate_season
+from benchmark.run import save
+
+
+def stored_points(store : ProfileStore) -> int:
+    """Nombre de points conservés par le stock, tous joueurs confondus."""
+    return sum(len(store.read_player(player)['Speed']) for player in store.players)
+
+
+def ingest_season(n_players : int, n_sessions : int, rate : float, dbscan_engines : list = ('sklearn', 'grid'), duration : float = 3600, seed : int = 0) -> list:
+    """Temps d'intégration de chaque date d'une saison synthétique, intégrée date par date dans un stock neuf.
+    Le stock conserve tous les points de la zone du DBSCAN (au-dessus de 5 m/s, tous les points) et relance le DBSCAN
+    sur toute la saison de chaque joueur concerné : le temps d'une intégration croît avec la saison."""
+    session, _ = generate_season(n_players, n_sessions, rate, duration = duration, seed = seed)
+    session['Acceleration'] = derive_acceleration(session.Speed.to_numpy(), pd.DatetimeIndex(session.Timestamp).asi8, session.Player.to_numpy())
+
+    records = []
+    for dbscan_engine in dbscan_engines :
+        with tempfile.TemporaryDirectory() as directory :
+            store = ProfileStore(directory, dbscan_engine = dbscan_engine)
+            for k, (date, points) in enumerate(session.groupby('Date')) :
+                start = time.perf_counter()
+                store.ingest(points, source = str(date))
+                records.append({'players' : n_players, 'rate' : rate, 'dbscan_engine' : dbscan_engine, 'session' : k + 1,
+                                'n_samples' : len(points), 'wall_time' : time.perf_counter() - start, 'stored_points' : stored_points(store)})
+    return records
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark.store",
+        description="Ingest time of the season profile store (--store), session after session")
+    parser.add_argument("--players", type=int, default=4, help="Number of players.")
+    parser.add_argument("--sessions", type=int, default=20, help="Number of sessions (one per day) ingested one after the other.")
+    parser.add_argument("--rate", type=float, default=10, help="Sampling rate (Hz).")
+    parser.add_argument("--duration", type=float, default=3600, help="Duration of a session (s).")
+    parser.add_argument("--dbscan_engines", type=str, nargs='+', default=['sklearn', 'grid'], choices=['sklearn', 'grid'])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=str, default="results/benchmark_store.json", help="JSON file of the results.")
+    args = parser.parse_args()
+
+    records = ingest_season(args.players, args.sessions, args.rate, args.dbscan_engines, args.duration, args.seed)
+    save(records, args.output)
+    results = pd.DataFrame(records)
+    print(results.pivot_table(index = 'session', columns = 'dbscan_engine', values = ['wall_time', 'stored_points'], sort = False).round(3).to_string())
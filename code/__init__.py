@@ -1,2 +1,9 @@
-from outliers import * 
-from regression import *
\ No newline at end of file
+import importlib
+
+# Chargement à la première utilisation : importer le paquet ne charge ni pandas, ni sklearn, ni statsmodels
+_exports = {'Outliers' : 'outliers', 'Regression' : 'regression'}
+
+def __getattr__(name):
+    if name in _exports :
+        return getattr(importlib.import_module(_exports[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from loading import cache_key, load_session
+
+# Clé de provenance des points
+KEYS = ['Player', 'Source', 'Date']
+
+
+def expand_sources(pattern : str) -> list:
+    """Fichiers csv d'un dossier ou d'un motif glob (ex : 'data/2023-*.csv'), triés."""
+    if os.path.isdir(pattern) :
+        pattern = os.path.join(pattern, '*.csv')
+    paths = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+    if not paths :
+        raise ValueError(f"Aucun fichier ne correspond à {pattern}")
+    return paths
+
+
+def read_sources(paths : list, sep : str = ',', convert_speed : bool = False, keep_acceleration : bool = False, smoothing : str = None, cache_dir : str = None, io_workers : int = 4, max_gap : float = None) -> pd.DataFrame:
+    """Lit les fichiers en parallèle (`io_workers` threads) et les concatène en une seule table, triée par joueur et horodatage.
+    Chaque fichier est mis en forme séparément (cf loading.load_session) : l'accélération n'est jamais dérivée d'un fichier à l'autre.
+    La colonne Source (catégorielle, dans l'ordre de `paths`) indique le fichier d'origine de chaque point."""
+    def key(path) :
+        return cache_key(path, sep, convert_speed, keep_acceleration, smoothing, max_gap)
+
+    def read(path, key) :
+        return load_session(path, sep, convert_speed, keep_acceleration, smoothing, cache_dir, key = key, max_gap = max_gap)
+
+    with ThreadPoolExecutor(max_workers = max(1, min(io_workers, len(paths)))) as executor :
+        # Les fichiers identiques (même contenu, mêmes options) ne sont lus qu'une fois
+        keys = list(executor.map(key, paths))
+        distinct = {}
+        for path, path_key in zip(paths, keys) :
+            distinct.setdefault(path_key, path)
+        sessions = dict(zip(distinct, executor.map(read, distinct.values(), distinct)))
+
+    frames = []
+    for path, path_key in zip(paths, keys) :
+        frame = sessions[path_key].copy()
+        frame['Source'] = path
+        frames.append(frame)
+    # Comme pour un seul fichier, la suite attend des points ordonnés par joueur
+    points = pd.concat(frames).sort_values(by = ['Player', 'Timestamp'], kind = 'stable', ignore_index = True)
+    points['Source'] = pd.Categorical(points.Source, categories = paths)
+    return points
+
+
+def count_points(points : pd.DataFrame, index : pd.MultiIndex) -> pd.Series:
+    """Nombre de points par (joueur, fichier, date), aligné sur `index`."""
+    if points.empty :
+        return pd.Series(0, index = index)
+    return points.groupby(index.names, observed = True).size().reindex(index, fill_value = 0)
+
+
+def provenance(points : pd.DataFrame, outliers, regression) -> pd.DataFrame:
+    """Table de provenance : points chargés, erreurs identifiées, points nettoyés et points à haute intensité
+    par (joueur, fichier, date), suivis du profil accélération-vitesse du joueur.
+    Si les profils portent sur d'autres clés (ex : Drill), elles sont ajoutées à la provenance."""
+    keys = KEYS + [key for key in regression.group_by if key not in KEYS]
+    index = points.groupby(keys, observed = True).size().index
+    table = pd.DataFrame({
+        'n_points' : count_points(points, index),
+        'n_misuse_error' : count_points(outliers.misuse_error, index),
+        'n_measurement_error' : count_points(outliers.measurement_error, index),
+        'n_correct' : count_points(outliers.correct_points, index),
+        'n_high_intensity' : count_points(regression.high_intensity_points, index),
+    })
+
+    profiles = [profile for profile in [regression.players_linear_regression, regression.compute_quantile_a0_s0() if not regression.players_quantile_regression.empty else pd.DataFrame()] if not profile.empty]
+    if profiles :
+        table = table.join(pd.concat(profiles, axis = 1), on = regression.group_by)
+    return table
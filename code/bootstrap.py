@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from quantile import EXACT_MAX_POINTS, QUANTILES
+from columns import group_name
+
+# Grandeurs estimées sur chaque rééchantillonnage (mêmes noms que les colonnes des résultats)
+ESTIMATES = ["a0 : Regression linéaire", "s0 : Regression linéaire", "a0 : Regression quantile", "s0 : Regression quantile"]
+
+
+def resample_weights(rng : np.random.Generator, n : int, n_resamples : int) -> np.ndarray:
+    """Rééchantillonnages avec remise de n points, sous forme de poids : nombre de tirages de chaque point (n_resamples, n)."""
+    return rng.multinomial(n, np.full(n, 1 / n), size = n_resamples).astype(float)
+
+
+def bootstrap_linear(x : np.ndarray, y : np.ndarray, weights : np.ndarray) -> tuple:
+    """Régression linéaire y = a + b * x de tous les rééchantillonnages à la fois (moindres carrés pondérés).
+    Comme Regression.group_linear_regression, a0 et s0 ne sont pas définis si R² <= 0.5."""
+    total = weights.sum(axis = 1)
+    mean_x, mean_y = weights @ x / total, weights @ y / total
+    # Moments centrés sur l'échantillon d'origine, pour limiter les erreurs d'arrondi
+    dx, dy = x - x.mean(), y - y.mean()
+    cx, cy = mean_x - x.mean(), mean_y - y.mean()
+    sxx = weights @ (dx * dx) / total - cx * cx
+    sxy = weights @ (dx * dy) / total - cx * cy
+    syy = weights @ (dy * dy) / total - cy * cy
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore') :
+        b = sxy / sxx
+        a = mean_y - b * mean_x
+        fitted = sxy * sxy / (sxx * syy) > 0.5
+        return np.where(fitted, a, np.nan), np.where(fitted, - a / b, np.nan)
+
+
+def bootstrap_quantile(x : np.ndarray, y : np.ndarray, weights : np.ndarray, quantiles : np.ndarray = QUANTILES, chunk_size : int = 2**24) -> tuple:
+    """Régression quantile exacte (cf quantile.quantile_regression) de tous les rééchantillonnages à la fois.
+
+    Un rééchantillon ne contient que des points de l'échantillon d'origine : les droites candidates sont les mêmes.
+    Les sommes de résidus positifs et négatifs de chaque candidate sont pondérées par le nombre de tirages
+    de chaque point, soit un produit matriciel pour tous les rééchantillonnages.
+
+    Retourne les tableaux (a, b) de taille (rééchantillonnages, quantiles)."""
+    quantiles = np.asarray(quantiles, dtype = float)
+    n_resamples = len(weights)
+
+    i, j = np.triu_indices(len(x), 1)
+    keep = x[i] != x[j]
+    i, j = i[keep], j[keep]
+    if len(i) == 0 :
+        return np.full((n_resamples, len(quantiles)), np.nan), np.full((n_resamples, len(quantiles)), np.nan)
+
+    slopes = (y[j] - y[i]) / (x[j] - x[i])
+    intercepts = y[i] - slopes * x[i]
+
+    # Meilleure droite par (quantile, rééchantillonnage), calculée par blocs de candidates pour borner la mémoire
+    best_loss = np.full((len(quantiles), n_resamples), np.inf)
+    best_pair = np.zeros((len(quantiles), n_resamples), dtype = int)
+    step = max(1, chunk_size // max(len(quantiles) * n_resamples, len(x), 1))
+    for start in range(0, len(slopes), step) :
+        residuals = y[None, :] - (intercepts[start:start + step, None] + slopes[start:start + step, None] * x[None, :])
+        positive = np.where(residuals > 0, residuals, 0) @ weights.T
+        negative = - np.where(residuals < 0, residuals, 0) @ weights.T
+
+        # q * positifs + (1 - q) * négatifs
+        loss = negative[None] + quantiles[:, None, None] * (positive - negative)[None]
+        chunk_best = loss.argmin(axis = 1)
+        chunk_loss = np.take_along_axis(loss, chunk_best[:, None, :], axis = 1)[:, 0, :]
+
+        better = chunk_loss < best_loss
+        best_loss[better] = chunk_loss[better]
+        best_pair[better] = chunk_best[better] + start
+
+    return intercepts[best_pair].T, slopes[best_pair].T
+
+
+def player_seed(seed : int, player : str, block : int) -> np.random.SeedSequence:
+    """Graine d'un bloc de rééchantillonnages d'un joueur : ne dépend ni des autres joueurs ni du nombre de processus."""
+    key = int.from_bytes(hashlib.blake2b(str(player).encode(), digest_size = 4).digest(), 'little')
+    return np.random.SeedSequence(seed, spawn_key = (key, block))
+
+
+def bootstrap_block(x : np.ndarray, y : np.ndarray, n_resamples : int, seed : np.random.SeedSequence, quantile : bool = True) -> np.ndarray:
+    """a0 et s0 (linéaires puis quantiles, moyennés sur les quantiles) d'un bloc de rééchantillonnages : tableau (n_resamples, 4).
+    Sans `quantile`, les valeurs quantiles ne sont pas calculées (NaN)."""
+    weights = resample_weights(np.random.default_rng(seed), len(x), n_resamples)
+    a0_linear, s0_linear = bootstrap_linear(x, y, weights)
+    if quantile :
+        a, b = bootstrap_quantile(x, y, weights)
+    else :
+        a, b = np.full((n_resamples, len(QUANTILES)), np.nan), np.full((n_resamples, len(QUANTILES)), np.nan)
+    with np.errstate(divide = 'ignore', invalid = 'ignore') :
+        s0_quantile = (- a / b).mean(axis = 1)
+    return np.column_stack([a0_linear, s0_linear, a.mean(axis = 1), s0_quantile])
+
+
+def bootstrap_profiles(high_intensity_points : pd.DataFrame, n_resamples : int = 1000, level : float = 0.95, seed : int = 0, workers : int = 1, block_size : int = 250, keys : list = ('Player',)) -> tuple:
+    """Intervalles de confiance bootstrap (percentiles, au niveau `level`) et écarts-types de a0 et s0 par joueur (ou groupe `keys`),
+    en rééchantillonnant ses points à haute intensité. Les rééchantillonnages sont traités par blocs de `block_size`,
+    répartis sur `workers` processus ; le résultat ne dépend que de `seed`.
+    Comme Regression.group_quantile_regression, le moteur exact est limité à EXACT_MAX_POINTS points (coût en n³ par rééchantillonnage) :
+    au-delà, seuls les intervalles linéaires sont calculés, les intervalles quantiles valent NaN.
+
+    Retourne (intervalles, diagnostics par joueur)."""
+    tasks, owners, diagnostics = [], [], {}
+    keys = list(keys)
+    for player, points in high_intensity_points.groupby(keys[0] if len(keys) == 1 else keys) :
+        x, y = points.Speed.to_numpy(dtype = float), points.Acceleration.to_numpy(dtype = float)
+        quantile = len(x) <= EXACT_MAX_POINTS
+        diagnostics[player] = {'n_points' : len(x), 'n_resamples' : n_resamples, 'quantile_engine' : 'exact' if quantile else None}
+        for block, start in enumerate(range(0, n_resamples, block_size)) :
+            tasks.append((x, y, min(block_size, n_resamples - start), player_seed(seed, group_name(player), block), quantile))
+            owners.append(player)
+
+    if workers > 1 and len(tasks) > 1 :
+        with ProcessPoolExecutor(max_workers = workers) as executor :
+            blocks = list(executor.map(bootstrap_block, *zip(*tasks)))
+    else :
+        blocks = [bootstrap_block(*task) for task in tasks]
+
+    estimates = {}
+    for player, block in zip(owners, blocks) :
+        estimates.setdefault(player, []).append(block)
+
+    alpha = (1 - level) / 2 * 100
+    rows = {}
+    for player, player_blocks in estimates.items() :
+        values = np.concatenate(player_blocks)
+        low, high = np.nanpercentile(values, [alpha, 100 - alpha], axis = 0)
+        row = {'n_resamples' : len(values)}
+        for k, name in enumerate(ESTIMATES) :
+            row[f"{name} low"] = low[k]
+            row[f"{name} high"] = high[k]
+            row[f"{name} se"] = np.nanstd(values[:, k], ddof = 1)
+        rows[player] = row
+    return pd.DataFrame.from_dict(rows, orient = 'index').rename_axis(keys[0] if len(keys) == 1 else keys), diagnostics
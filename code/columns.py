@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+class PointColumns():
+    """
+    Colonnes d'une table de points partagées par les étapes de nettoyage et de sélection (Outliers, Regression).
+    Les groupes profilés (colonnes `keys`, Player par défaut) sont codés en entiers (int32, -1 si une clé est indéfinie),
+    Speed et Acceleration sont des vues sur la table, sans copie.
+    Chaque colonne n'est construite qu'à sa première utilisation. La table d'origine ne sert qu'à construire les résultats.
+    """
+    def __init__(self, points : pd.DataFrame, keys : list = ('Player',)) -> None:
+        self.frame = points
+        self.keys = list(keys)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @cached_property
+    def group_codes(self) -> np.ndarray:
+        codes, self.groups = group_codes(self.frame, self.keys)
+        return codes
+
+    @cached_property
+    def speed(self) -> np.ndarray:
+        return self.frame.Speed.to_numpy(dtype = float)
+
+    @cached_property
+    def acceleration(self) -> np.ndarray:
+        return self.frame.Acceleration.to_numpy(dtype = float)
+
+
+class PointSelection():
+    """
+    Lignes d'une PointColumns désignées par leurs positions (toutes si `positions` vaut None).
+    Une étape de nettoyage produit une nouvelle sélection ; les lignes ne sont copiées qu'à la construction d'un DataFrame de sortie.
+    """
+    def __init__(self, columns : PointColumns, positions : np.ndarray = None) -> None:
+        self.columns = columns
+        self.positions = positions
+
+    @classmethod
+    def of(cls, points, keys : list = ('Player',)) -> 'PointSelection':
+        """Sélection de toutes les lignes d'un DataFrame, groupées selon `keys` (ou la sélection elle-même, avec ses groupes)."""
+        return points if isinstance(points, cls) else cls(PointColumns(points, keys))
+
+    def __len__(self) -> int:
+        return len(self.columns) if self.positions is None else len(self.positions)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def values(self, name : str) -> np.ndarray:
+        """Colonne `name` de PointColumns restreinte à la sélection (vue si toutes les lignes sont sélectionnées)."""
+        values = getattr(self.columns, name)
+        return values if self.positions is None else values[self.positions]
+
+    def select(self, keep : np.ndarray) -> 'PointSelection':
+        """Sous-sélection selon un masque booléen aligné sur la sélection."""
+        # Positions sur 32 bits tant que la table le permet
+        keep = np.flatnonzero(keep).astype(np.int32 if len(self.columns) < 2**31 else np.int64)
+        return PointSelection(self.columns, keep if self.positions is None else self.positions[keep])
+
+    def isin(self, name : str, values) -> np.ndarray:
+        """Masque, aligné sur la sélection, des lignes dont la colonne `name` de la table d'origine prend une valeur de `values`."""
+        mask = self.columns.frame[name].isin(values).to_numpy()
+        return mask if self.positions is None else mask[self.positions]
+
+    def groups(self) -> list:
+        """Groupes de la sélection (joueurs par défaut, tuples si plusieurs clés), dans l'ordre d'apparition (cf Series.unique)."""
+        codes = pd.unique(self.values('group_codes'))
+        return self.columns.groups.take(codes[codes >= 0]).tolist()
+
+    def take(self, positions : np.ndarray) -> pd.DataFrame:
+        """Copie des lignes `positions` (relatives à la sélection) de la table d'origine, avec leur index."""
+        return self.columns.frame.iloc[positions if self.positions is None else self.positions[positions]]
+
+    @cached_property
+    def frame(self) -> pd.DataFrame:
+        """Lignes sélectionnées de la table d'origine, construites à la première demande."""
+        return self.columns.frame if self.positions is None else self.columns.frame.iloc[self.positions]
+
+
+def dense_rank(keys : list, values : np.ndarray) -> np.ndarray:
+    """Rang dense des valeurs décroissantes à l'intérieur de chaque groupe de clés,
+    comme DataFrame.groupby(keys).rank(method = 'dense', ascending = False). Les clés et valeurs doivent être définies."""
+    rank = np.empty(len(values))
+    if len(values) == 0 :
+        return rank
+    # Un seul tri : groupes puis valeurs décroissantes
+    order = np.lexsort((- values,) + tuple(keys[::-1]))
+    new_group = np.zeros(len(values), dtype = bool)
+    new_group[0] = True
+    for key in keys :
+        key = key[order]
+        new_group[1:] |= key[1:] != key[:-1]
+    values = values[order]
+    new_value = new_group.copy()
+    new_value[1:] |= values[1:] != values[:-1]
+    del values
+
+    # Nombre de valeurs distinctes depuis le début du groupe
+    distinct = np.cumsum(new_value)
+    distinct -= distinct[new_group][np.cumsum(new_group) - 1] - 1
+    rank[order] = distinct
+    return rank
+
+
+def group_codes(frame : pd.DataFrame, keys : list) -> tuple:
+    """Codes entiers (int32) des groupes définis par les colonnes `keys`, numérotés dans l'ordre croissant des clés comme un groupby,
+    -1 si une des clés est indéfinie. Retourne aussi les groupes (Index nommé, MultiIndex si plusieurs clés)."""
+    if len(keys) == 1 :
+        codes, groups = pd.factorize(frame[keys[0]], sort = True)
+        return codes.astype(np.int32), pd.Index(groups, name = keys[0])
+
+    # Codes de chaque clé, combinés en un seul entier (ordre lexicographique des clés), puis numérotés sans tri des lignes
+    factorized = [pd.factorize(frame[key], sort = True) for key in keys]
+    sizes = [max(len(uniques), 1) for _, uniques in factorized]
+    if np.prod(sizes, dtype = float) >= 2**63 :
+        raise ValueError(f"Trop de combinaisons de clés {keys}")
+    combined = np.zeros(len(frame), dtype = np.int64)
+    valid = np.ones(len(frame), dtype = bool)
+    for (key_codes, _), size in zip(factorized, sizes) :
+        combined = combined * size + key_codes
+        valid &= key_codes >= 0
+    group, distinct = pd.factorize(combined[valid], sort = True)
+    codes = np.full(len(frame), -1, dtype = np.int32)
+    codes[valid] = group
+
+    # Clés de chaque groupe, retrouvées depuis le code combiné
+    levels = []
+    for (_, uniques), size in reversed(list(zip(factorized, sizes))) :
+        levels.append(uniques.take(distinct % size))
+        distinct = distinct // size
+    return codes, pd.MultiIndex.from_arrays(levels[::-1], names = keys)
+
+
+def group_name(group) -> str:
+    """Nom d'un groupe pour les fichiers et les titres : 'Adrien', ou 'Adrien_Sprint' si plusieurs clés."""
+    return '_'.join(str(key) for key in group) if isinstance(group, tuple) else str(group)
+
+
+class Groups():
+    """
+    Moteur de groupby : un seul tri stable des codes de groupe, puis chaque groupe est une tranche contiguë
+    [offsets[k], offsets[k + 1]) des lignes triées (ordre d'origine conservé dans un groupe). Les lignes de code -1 sont écartées.
+    Les noyaux (maximum, régressions...) s'exécutent sur ces tranches au lieu d'un groupby.apply.
+    """
+    def __init__(self, codes : np.ndarray) -> None:
+        order = np.argsort(codes, kind = 'stable')
+        codes = codes[order]
+        start = np.searchsorted(codes, 0)
+        self.order, codes = order[start:], codes[start:]
+        starts = np.flatnonzero(np.diff(codes)) + 1
+        self.offsets = np.concatenate([[0], starts, [len(codes)]]) if len(codes) else np.zeros(1, dtype = np.int64)
+        # Code de chaque groupe, croissant
+        self.codes = codes[self.offsets[:-1]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def sort(self, values : np.ndarray) -> np.ndarray:
+        """Valeurs rangées groupe par groupe."""
+        return values[self.order]
+
+    def slices(self):
+        """(code, tranche) de chaque groupe, à appliquer aux valeurs rangées par `sort`."""
+        for k, code in enumerate(self.codes) :
+            yield code, slice(self.offsets[k], self.offsets[k + 1])
+
+    def reduce(self, ufunc : np.ufunc, values : np.ndarray) -> np.ndarray:
+        """Réduction de `values` par groupe (ex : np.maximum), en une passe sur les tranches."""
+        return ufunc.reduceat(self.sort(values), self.offsets[:-1]) if len(self) else np.empty(0, dtype = values.dtype)
+
+    def broadcast(self, values : np.ndarray, size : int) -> np.ndarray:
+        """Valeur de son groupe pour chaque ligne (NaN pour les lignes écartées)."""
+        result = np.full(size, np.nan)
+        result[self.order] = np.repeat(values, np.diff(self.offsets))
+        return result
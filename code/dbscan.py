@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# Décalages des cellules voisines : avec des cellules de côté eps / √2, les voisins à moins de eps sont à deux cellules au plus
+OFFSETS = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)]
+
+
+def dbscan_noise(groups : np.ndarray, x : np.ndarray, y : np.ndarray, eps : float = 0.5, min_samples : int = 3, chunk_size : int = 2**22) -> np.ndarray:
+    """Points considérés comme du bruit par un DBSCAN (mêmes règles que sklearn), pour tous les groupes en une passe.
+
+    Les points sont rangés dans une grille de côté eps / √2 : deux points d'une même cellule sont à moins de eps,
+    donc une cellule contenant au moins min_samples points ne contient que des points coeurs.
+    Seuls les points des autres cellules sont comparés à leurs voisins, cellule par cellule.
+    Un point est du bruit s'il n'est pas un point coeur et n'a aucun point coeur à moins de eps."""
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+    group_codes = pd.factorize(np.asarray(groups))[0].astype(np.int64)
+    if len(x) == 0 :
+        return np.zeros(0, dtype = bool)
+
+    # Identifiant de cellule (groupe, cx, cy), marge de 2 cellules pour ne pas déborder sur la cellule suivante
+    side = eps / np.sqrt(2) * (1 - 1e-9)
+    cx = np.floor(x / side).astype(np.int64)
+    cy = np.floor(y / side).astype(np.int64)
+    cx, cy = cx - cx.min() + 2, cy - cy.min() + 2
+    nx, ny = cx.max() + 3, cy.max() + 3
+    keys = (group_codes * nx + cx) * ny + cy
+
+    order = np.argsort(keys, kind = 'stable')
+    cell_keys, cell_start, cell_count = np.unique(keys[order], return_index = True, return_counts = True)
+    point_cell = np.searchsorted(cell_keys, keys)
+
+    # Points coeurs : cellules pleines, puis comptage des voisins pour les autres
+    core = cell_count[point_cell] >= min_samples
+    queries = np.flatnonzero(~core)
+    counts = np.zeros(len(x), dtype = np.int64)
+    for query, neighbour in neighbour_pairs(queries, keys, ny, order, cell_keys, cell_start, cell_count, chunk_size) :
+        close = (x[query] - x[neighbour])**2 + (y[query] - y[neighbour])**2 <= eps**2
+        counts += np.bincount(query[close], minlength = len(x))
+    core[queries] = counts[queries] >= min_samples
+
+    # Bruit : ni coeur, ni à moins de eps d'un point coeur
+    queries = np.flatnonzero(~core)
+    reachable = np.zeros(len(x), dtype = bool)
+    for query, neighbour in neighbour_pairs(queries, keys, ny, order, cell_keys, cell_start, cell_count, chunk_size) :
+        close = core[neighbour] & ((x[query] - x[neighbour])**2 + (y[query] - y[neighbour])**2 <= eps**2)
+        reachable[query[close]] = True
+    return ~core & ~reachable
+
+
+def neighbour_pairs(queries : np.ndarray, keys : np.ndarray, ny : int, order : np.ndarray, cell_keys : np.ndarray, cell_start : np.ndarray, cell_count : np.ndarray, chunk_size : int):
+    """Génère, par blocs d'au plus `chunk_size` couples, les couples (point, point d'une cellule voisine)."""
+    if len(queries) == 0 :
+        return
+
+    # Cellules voisines existantes de chaque point
+    neighbour_cells = np.empty((len(queries), len(OFFSETS)), dtype = np.int64)
+    for k, (dx, dy) in enumerate(OFFSETS) :
+        neighbour_keys = keys[queries] + dx * ny + dy
+        position = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        neighbour_cells[:, k] = np.where(cell_keys[position] == neighbour_keys, position, -1)
+    sizes = np.where(neighbour_cells >= 0, cell_count[neighbour_cells], 0)
+
+    # Découpage en blocs de points selon le nombre de couples
+    total = np.cumsum(sizes.sum(axis = 1))
+    bounds = np.searchsorted(total, np.arange(0, total[-1], chunk_size), side = 'right')
+    bounds = np.unique(np.concatenate([[0], bounds, [len(queries)]]))
+
+    for start, stop in zip(bounds[:-1], bounds[1:]) :
+        cells = neighbour_cells[start:stop].ravel()
+        chunk_sizes = sizes[start:stop].ravel()
+        query = np.repeat(np.repeat(queries[start:stop], len(OFFSETS)), chunk_sizes)
+        # Position de chaque couple dans sa cellule voisine
+        within = np.arange(chunk_sizes.sum()) - np.repeat(np.cumsum(chunk_sizes) - chunk_sizes, chunk_sizes)
+        neighbour = order[np.repeat(cell_start[np.maximum(cells, 0)], chunk_sizes) + within]
+        yield query, neighbour
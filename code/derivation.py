@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# Trou maximal par défaut : MAX_GAP_FACTOR périodes d'échantillonnage (médiane), et au moins MIN_MAX_GAP secondes
+MAX_GAP_FACTOR = 3
+MIN_MAX_GAP = 1.0
+
+
+def default_max_gap(groups : np.ndarray, timestamps : np.ndarray) -> float:
+    """Trou maximal (s) adapté à la fréquence d'échantillonnage : MAX_GAP_FACTOR fois l'intervalle médian
+    entre deux points d'un même joueur, sans descendre sous MIN_MAX_GAP (1 s pour les GPS à 10 Hz et plus).
+    Données triées par (joueur, horodatage) ; `timestamps` en int64 (ns)."""
+    if len(timestamps) < 2 :
+        return MIN_MAX_GAP
+    codes = pd.factorize(np.asarray(groups))[0]
+    dt = np.diff(np.asarray(timestamps, dtype = np.int64))
+    dt = dt[(codes[1:] == codes[:-1]) & (dt > 0)]
+    return max(MIN_MAX_GAP, MAX_GAP_FACTOR * np.median(dt) * 1e-9) if len(dt) else MIN_MAX_GAP
+
+
+def segment_starts(groups : np.ndarray, timestamps : np.ndarray, max_gap : float = None) -> np.ndarray:
+    """Début des segments continus : changement de joueur, trou de plus de `max_gap` secondes ou horodatage non croissant.
+    Les données doivent être triées par (joueur, horodatage) ; `timestamps` en int64 (ns).
+    Sans `max_gap`, le trou maximal dépend de la fréquence d'échantillonnage (cf default_max_gap)."""
+    starts = np.ones(len(timestamps), dtype = bool)
+    if len(timestamps) > 1 :
+        if max_gap is None :
+            max_gap = default_max_gap(groups, timestamps)
+        codes = pd.factorize(np.asarray(groups))[0]
+        dt = np.diff(timestamps)
+        starts[1:] = (codes[1:] != codes[:-1]) | (dt <= 0) | (dt > max_gap * 1e9)
+    return starts
+
+
+def derive_acceleration(speed : np.ndarray, timestamps : np.ndarray, groups : np.ndarray, max_gap : float = None, smoothing : str = None, window : int = 5, polyorder : int = 2, alpha : float = 0.5) -> np.ndarray:
+    """Accélération (m/s²) par différences finies à l'intérieur de chaque segment continu, sans passer par un DataFrame.
+    Le premier point d'un segment n'a pas d'accélération (NaN). Sans `max_gap`, cf default_max_gap.
+
+    `smoothing` filtre la dérivée segment par segment, en une seule passe sur tout le tableau :
+        - 'savgol' : filtre de Savitzky–Golay (fenêtre `window`, degré `polyorder`), les bords de segment restent bruts ;
+        - 'exponential' : moyenne exponentielle de coefficient `alpha`, réinitialisée à chaque segment."""
+    speed = np.asarray(speed, dtype = float)
+    timestamps = np.asarray(timestamps, dtype = np.int64)
+    starts = segment_starts(groups, timestamps, max_gap)
+
+    acceleration = np.full(len(speed), np.nan)
+    with np.errstate(divide = 'ignore', invalid = 'ignore') :
+        acceleration[1:] = np.diff(speed) / (np.diff(timestamps) * 1e-9)
+    acceleration[starts] = np.nan
+
+    if smoothing is None :
+        return acceleration
+
+    # La dérivée est définie à partir du deuxième point de chaque segment
+    first = np.flatnonzero(starts) + 1
+    first = first[first < len(speed)]
+    first = first[~starts[first]]
+    values = np.where(starts, 0., acceleration)
+
+    # scipy n'est chargé que si un filtre est demandé
+    from scipy.signal import lfilter, savgol_coeffs
+
+    if smoothing == 'savgol' :
+        # Position dans le segment et longueur restante, pour ne garder que les fenêtres complètes
+        segment = np.cumsum(starts) - 1
+        segment_start = np.flatnonzero(starts)
+        segment_stop = np.append(segment_start[1:], len(speed))
+        position = np.arange(len(speed)) - segment_start[segment] - 1
+        remaining = segment_stop[segment] - np.arange(len(speed)) - 1
+        half = window // 2
+        inside = ~starts & (position >= half) & (remaining >= half)
+
+        smoothed = np.convolve(values, savgol_coeffs(window, polyorder), mode = 'same')
+        acceleration = np.where(inside, smoothed, acceleration)
+
+    elif smoothing == 'exponential' :
+        # Moyenne exponentielle sur tout le tableau, puis retrait de l'héritage du segment précédent :
+        # l'écart au premier point d'un segment décroît ensuite de (1 - alpha) par point
+        smoothed = lfilter([alpha], [1, alpha - 1], values)
+        correction = np.zeros(len(speed))
+        correction[first] = (1 - alpha) * (values[first] - smoothed[first - 1])
+
+        anchors = starts.copy()
+        anchors[first] = True
+        anchor = np.maximum.accumulate(np.where(anchors, np.arange(len(speed)), 0))
+        decay = (1 - alpha) ** (np.arange(len(speed)) - anchor)
+        acceleration = np.where(starts, np.nan, smoothed + correction[anchor] * decay)
+
+    else :
+        raise ValueError(f"Filtre de lissage inconnu : {smoothing}")
+
+    return acceleration
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import cProfile
+import platform
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from columns import PointSelection, group_name
+
+try :
+    import resource
+except ImportError : # Windows
+    resource = None
+
+
+def max_rss() -> float:
+    """Mémoire résidente maximale (Mo) du processus depuis son lancement (None si indisponible)."""
+    if resource is None :
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+
+def count_rows(points) -> dict:
+    """Nombre de lignes au total et par joueur, d'un DataFrame ou d'une PointSelection (sans copie, par groupe profilé)."""
+    if isinstance(points, PointSelection) and not points.empty :
+        codes = points.values('group_codes')
+        groups = points.columns.groups
+        counts = np.bincount(codes[codes >= 0], minlength = len(groups))
+        return {'total' : len(points), 'players' : {group_name(groups[code]) : int(counts[code]) for code in pd.unique(codes[codes >= 0])}}
+    if points.empty or 'Player' not in points.columns :
+        return {'total' : len(points), 'players' : {}}
+    counts = points.Player.value_counts(sort = False)
+    return {'total' : len(points), 'players' : {str(player) : int(n) for player, n in counts.items()}}
+
+
+def to_json(value):
+    """Conversion des types NumPy pour json.dump."""
+    if isinstance(value, np.generic) :
+        return value.item()
+    if isinstance(value, np.ndarray) :
+        return value.tolist()
+    return str(value)
+
+
+class Report():
+    """
+    Mesures d'une exécution : temps et mémoire de chaque étape, lignes par joueur en entrée et en sortie,
+    warnings émis et diagnostics des régressions. Désactivé, il ne mesure rien.
+    """
+    def __init__(self, enabled : bool = True) -> None:
+        self.enabled = enabled
+        self.stages = []
+        self.diagnostics = {}
+        self.profile_path = None
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name : str, rows_in = None, rows_out = None):
+        """Mesure le bloc `with` comme l'étape `name`.
+        `rows_in` et `rows_out` : fonctions renvoyant les points avant et après l'étape, pour les comptages par joueur."""
+        if not self.enabled :
+            yield
+            return
+
+        record = {'stage' : name}
+        if rows_in is not None :
+            record['rows_in'] = count_rows(rows_in())
+
+        # Les warnings sont ignorés par défaut (cf outliers.py) : on les enregistre le temps de l'étape
+        with warnings.catch_warnings(record = True) as caught :
+            warnings.simplefilter('always')
+            start, cpu_start = time.perf_counter(), time.process_time()
+            yield
+            record['wall_time'] = time.perf_counter() - start
+            record['cpu_time'] = time.process_time() - cpu_start
+
+        record['max_rss'] = max_rss()
+        if rows_out is not None :
+            record['rows_out'] = count_rows(rows_out())
+        record['warnings'] = [f"{w.category.__name__}: {w.message}" for w in caught]
+        self.stages.append(record)
+
+    def fits(self, diagnostics : dict) -> None:
+        """Ajoute les diagnostics des régressions ({modèle : {joueur : {...}}}, cf Regression.diagnostics)."""
+        if not self.enabled :
+            return
+        for model, players in diagnostics.items() :
+            self.diagnostics.setdefault(model, {}).update({group_name(player) : values for player, values in players.items()})
+
+    @contextmanager
+    def profile(self, path : str = None):
+        """Profil cProfile du bloc `with`, écrit dans `path` (lisible avec pstats ou snakeviz). Sans `path`, ne fait rien."""
+        if path is None :
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try :
+            yield
+        finally :
+            profiler.disable()
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+            profiler.dump_stats(path)
+            self.profile_path = path
+
+    def save(self, path : str, **context) -> None:
+        """Écrit le rapport en JSON. `context` : paramètres de l'exécution (fichier, dv, n_max, ...)."""
+        if not self.enabled :
+            return
+        report = {
+            'date' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python' : platform.python_version(),
+            'context' : context,
+            'wall_time' : time.perf_counter() - self.start,
+            'max_rss' : max_rss(),
+            'stages' : self.stages,
+            'diagnostics' : self.diagnostics,
+            'profile' : self.profile_path,
+        }
+        with open(path, 'w') as f :
+            json.dump(report, f, indent = 1, default = to_json)
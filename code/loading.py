@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from derivation import derive_acceleration
+
+# À incrémenter si la mise en forme des sessions change (invalide le cache)
+CACHE_VERSION = 4
+
+# Colonnes toujours stockées en float64 dans le cache
+NUMERIC_COLUMNS = ['Speed', 'Acceleration']
+
+
+def read_session(path : str, sep : str = ',', convert_speed : bool = False, keep_acceleration : bool = False, smoothing : str = None, max_gap : float = None) -> pd.DataFrame:
+    """Lecture d'un fichier de session et mise en forme : types numériques, m/s, Date, tri par joueur et recalcul de l'accélération.
+    `smoothing` : filtre appliqué à l'accélération recalculée, `max_gap` : trou maximal (s) franchi par la dérivée,
+    déduit de la fréquence d'échantillonnage s'il n'est pas donné (cf derivation.derive_acceleration)."""
+    df_session = pd.read_csv(path, parse_dates=['Timestamp'], sep = sep)
+
+    if not "Acceleration" in df_session.columns :
+        df_session.loc[:, 'Acceleration'] = 0
+    df_session = df_session.dropna(subset=['Acceleration', 'Speed'])
+
+    # Conversion en type numérique (colonnes remplacées en entier : `.loc[:, col] =` conserverait le type object)
+    try :
+        df_session['Speed'] = pd.to_numeric(df_session.Speed)
+        df_session['Acceleration'] = pd.to_numeric(df_session.Acceleration)
+    except :
+        df_session['Speed'] = pd.to_numeric(df_session.Speed.str.replace(',', '.').astype(float))
+        df_session['Acceleration'] = pd.to_numeric(df_session.Acceleration.str.replace(',', '.').astype(float))
+
+    # Km/h to m/s ?
+    if convert_speed :
+        df_session['Speed'] = df_session.Speed / 3.6
+
+    # La date est nécessaire pour la suite
+    if not 'Date' in df_session.columns :
+        df_session.loc[:, 'Date'] = df_session.Timestamp.dt.date
+
+    # Si calcul de l'accélération il est nécessaire d'ordonner le fichier
+    df_session = df_session.sort_values(by = ['Player', 'Timestamp'])
+
+    # Recalcul de l'accélération ? (joueur par joueur, sans franchir les interruptions)
+    if not keep_acceleration :
+        df_session["Acceleration"] = derive_acceleration(df_session.Speed.to_numpy(dtype = float), pd.DatetimeIndex(df_session.Timestamp).asi8, df_session.Player.to_numpy(), max_gap = max_gap, smoothing = smoothing)
+    return df_session
+
+
+def file_hash(path : str, chunk_size : int = 2**24) -> str:
+    """Empreinte du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.blake2b(digest_size = 16)
+    with open(path, 'rb') as f :
+        for chunk in iter(lambda : f.read(chunk_size), b'') :
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(path : str, sep : str, convert_speed : bool, keep_acceleration : bool, smoothing : str = None, max_gap : float = None) -> str:
+    """Clé du cache : contenu du fichier et options de mise en forme (-s / -k / --smoothing / --max_gap)."""
+    options = f"v{CACHE_VERSION}|sep={sep}|s={int(convert_speed)}|k={int(keep_acceleration)}|smoothing={smoothing}|max_gap={max_gap if max_gap is None else float(max_gap)!r}"
+    return file_hash(path) + '_' + hashlib.blake2b(options.encode(), digest_size = 4).hexdigest()
+
+
+def write_cache(df : pd.DataFrame, directory : str) -> None:
+    """Écrit une session mise en forme, colonne par colonne, en fichiers .npy.
+    Les colonnes texte sont stockées en codes entiers + catégories, les dates en int64 (ns).
+    Speed et Acceleration sont converties en float64 (erreur si elles ne sont pas numériques) plutôt que stockées en objets.
+    Plusieurs écrivains (threads ou processus) peuvent écrire la même entrée : chacun écrit dans son propre dossier temporaire."""
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok = True)
+    tmp_directory = tempfile.mkdtemp(dir = parent, prefix = os.path.basename(directory) + '.', suffix = '.tmp')
+
+    columns = []
+    for k, column in enumerate(df.columns) :
+        values = df[column]
+        if column in NUMERIC_COLUMNS :
+            values = pd.to_numeric(values).astype(float)
+        if pd.api.types.is_datetime64_any_dtype(values) :
+            tz = str(values.dt.tz) if values.dt.tz is not None else None
+            values = values.dt.tz_convert(None) if tz else values
+            np.save(os.path.join(tmp_directory, f"{k}.npy"), values.to_numpy(dtype = 'datetime64[ns]').view('int64'))
+            columns.append({'name' : column, 'kind' : 'datetime', 'tz' : tz})
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values) :
+            np.save(os.path.join(tmp_directory, f"{k}.npy"), values.to_numpy())
+            columns.append({'name' : column, 'kind' : 'numeric'})
+        else :
+            codes, categories = pd.factorize(values)
+            if all(isinstance(c, str) for c in categories) :
+                kind = 'category'
+            elif all(isinstance(c, datetime.date) and not isinstance(c, datetime.datetime) for c in categories) :
+                kind, categories = 'date', pd.Index([c.isoformat() for c in categories])
+            else :
+                kind = 'object'
+            np.save(os.path.join(tmp_directory, f"{k}.npy"), codes.astype(np.int32))
+            np.save(os.path.join(tmp_directory, f"{k}_categories.npy"), np.asarray(categories, dtype = str if kind != 'object' else object), allow_pickle = kind == 'object')
+            columns.append({'name' : column, 'kind' : kind})
+
+    np.save(os.path.join(tmp_directory, "index.npy"), df.index.to_numpy())
+    with open(os.path.join(tmp_directory, "meta.json"), 'w') as f :
+        json.dump({'version' : CACHE_VERSION, 'columns' : columns}, f)
+
+    # Écriture atomique : un cache n'est visible qu'une fois complet
+    # Une entrée complète écrite entre-temps par un autre écrivain est conservée ; une entrée incomplète (ancienne version) est remplacée
+    if os.path.isdir(directory) and not os.path.isfile(os.path.join(directory, "meta.json")) :
+        shutil.rmtree(directory, ignore_errors = True)
+    try :
+        os.replace(tmp_directory, directory)
+    except OSError :
+        if not os.path.isfile(os.path.join(directory, "meta.json")) :
+            raise
+    finally :
+        shutil.rmtree(tmp_directory, ignore_errors = True)
+
+
+def read_cache(directory : str) -> pd.DataFrame:
+    """Relit une session écrite par `write_cache`, sans analyse ni tri.
+    Les colonnes sont copiées dans le DataFrame (Player et les autres colonnes texte redeviennent des objets)."""
+    with open(os.path.join(directory, "meta.json")) as f :
+        meta = json.load(f)
+
+    data = {}
+    for k, column in enumerate(meta['columns']) :
+        values = np.load(os.path.join(directory, f"{k}.npy"))
+        if column['kind'] == 'datetime' :
+            values = pd.Series(values.view('datetime64[ns]'))
+            data[column['name']] = values.dt.tz_localize('UTC').dt.tz_convert(column['tz']).array if column['tz'] else values.array
+        elif column['kind'] == 'numeric' :
+            data[column['name']] = values
+        else :
+            categories = np.load(os.path.join(directory, f"{k}_categories.npy"), allow_pickle = column['kind'] == 'object')
+            if column['kind'] == 'date' :
+                categories = pd.to_datetime(categories).date
+            data[column['name']] = pd.Categorical.from_codes(values, categories.astype(object)).astype(object)
+
+    index = np.load(os.path.join(directory, "index.npy"), allow_pickle = True)
+    return pd.DataFrame(data, index = index)
+
+
+def load_session(path : str, sep : str = ',', convert_speed : bool = False, keep_acceleration : bool = False, smoothing : str = None, cache_dir : str = None, key : str = None, max_gap : float = None) -> pd.DataFrame:
+    """Session mise en forme, relue depuis le cache si le fichier et les options n'ont pas changé.
+    `key` : clé du cache (cf cache_key) si elle est déjà calculée."""
+    if cache_dir is None :
+        return read_session(path, sep, convert_speed, keep_acceleration, smoothing, max_gap)
+
+    directory = os.path.join(cache_dir, key if key else cache_key(path, sep, convert_speed, keep_acceleration, smoothing, max_gap))
+    if os.path.isfile(os.path.join(directory, "meta.json")) :
+        return read_cache(directory)
+
+    df_session = read_session(path, sep, convert_speed, keep_acceleration, smoothing, max_gap)
+    write_cache(df_session, directory)
+    return df_session
@@ -5,9 +5,11 @@ Created on Wed Jun  9 16:55:56 2023
 @author: N. Miguens 
 """
 
+import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
-from sklearn.cluster import DBSCAN
+
+from dbscan import dbscan_noise
+from columns import PointSelection, Groups, group_name
 
 # Permet de ne pas afficher les warnings
 import warnings
@@ -18,93 +20,124 @@ class Outliers():
     Objet identifiant les erreurs de mesure et de mauvaise utilisation.
     Contient les bons points, les erreurs de mesure et erreurs de mauvaise utilisation.
     """
-    def __init__(self, points : pd.DataFrame, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float= 0.5) -> None:
+    def __init__(self, points, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float= 0.5, dbscan_engine : str = 'sklearn', group_by : list = ('Player',)) -> None:
+        """`points` : DataFrame ou PointSelection (cf columns.py), partagée sans copie.
+        `group_by` : colonnes des groupes profilés (ex : ['Player', 'Drill']), sur lesquels le DBSCAN est appliqué."""
         # Deux types d'erreurs que l'on peut supprimer
         self.measurement_error = pd.DataFrame()
         self.misuse_error = pd.DataFrame()
 
-        # Ensemble des joueurs du dataframe
-        self.players = points.Player.unique()
+        # Ensemble des groupes (joueurs par défaut) du dataframe
+        points = PointSelection.of(points, group_by)
+        self.group_by = points.columns.keys
+        self.players = points.groups()
 
         # Paramètres des méthodes d'identification des erreurs
         self.nb_outlier = nb_outlier
         self.neighb_DBSCAN = neighb_DBSCAN
         self.eps_DBSCAN = eps_DBSCAN
+        if dbscan_engine not in ['sklearn', 'grid'] :
+            raise ValueError(f"Moteur de DBSCAN inconnu : {dbscan_engine}")
+        self.dbscan_engine = dbscan_engine # 'sklearn' (un DBSCAN par groupe) ou 'grid' (grille, tous les groupes en une passe)
 
         # Suppression des valeurs négatives (inutiles ici)
-        self.correct_points = points[(points.Acceleration >= 0)]
+        # Les étapes ne font que restreindre la sélection des bons points : aucune copie de la table
+        self.correct_selection = points.select(points.values('acceleration') >= 0)
+
+    @property
+    def correct_points(self) -> pd.DataFrame:
+        """Bons points, copiés depuis la table d'origine à la première demande."""
+        return self.correct_selection.frame
 
     def misuse_error_identification(self) -> pd.DataFrame :
         """Identification des erreurs de mauvaises utilisations.
-        10.93 - 10.93/10.5 * vitesse : mean + 3 * std (cf papier)."""
-        # Identification
-        outliers = self.correct_points[(self.correct_points.Acceleration >= 0) & (self.correct_points.Acceleration >= 10.93 - 10.93/10.5 * self.correct_points.Speed)]
-        outliers.loc[:, 'n_error'] = outliers.groupby(['Player', 'Date']).Speed.transform('count')
-        outliers = outliers[outliers.n_error >= self.nb_outlier]
+        10.93 - 10.93/10.5 * vitesse : mean + 3 * std (cf papier).
+        La règle porte sur un capteur, donc sur un joueur et une date, quels que soient les groupes profilés."""
+        points = self.correct_selection
+        speed, acceleration = points.values('speed'), points.values('acceleration')
+
+        # Identification : seuls les points au-dessus de la droite sont copiés, puis comptés par (joueur, date)
+        outliers = points.take(np.flatnonzero((acceleration >= 0) & (acceleration >= 10.93 - 10.93/10.5 * speed)))
+        players, dates = pd.factorize(outliers.Player)[0], pd.factorize(outliers.Date)[0]
+        _, group, n_error = np.unique(np.column_stack([players, dates]), axis = 0, return_inverse = True, return_counts = True)
+        n_error = n_error[group.ravel()]
+        error = (n_error >= self.nb_outlier) & (players >= 0) & (dates >= 0)
+        outliers = outliers[error].assign(n_error = n_error[error])
 
         # Suppression des outliers dans la base
-        outliers_Date = outliers.reset_index().Date.unique()
-        self.correct_points = self.correct_points[~self.correct_points.Date.isin(outliers_Date)]
+        outliers_Date = outliers.Date.unique()
+        if len(outliers_Date) :
+            self.correct_selection = points.select(~points.isin('Date', outliers_Date))
 
         # Sauvegarde de ces points
-        self.misuse_error = outliers.copy()
-        return self.correct_points[self.correct_points.Date.isin(outliers_Date)]
+        self.misuse_error = outliers
+        return points.take(np.arange(0))
 
     def measurement_error_identification(self) -> pd.DataFrame :
         """Identification des erreurs de mesure. Le DBSCAN permet d'isoler les points qui sont physiquement trop loin des autres pour correspondre à une trajectoire plausible."""
         # Identification des erreurs de mesures
         # Pour réduire le temps de calcul, on conserve uniquement les points intéressants pour le DBSCAN 
-        players_sample = self.correct_points[self.correct_points.Acceleration >= 5 - self.correct_points.Speed] 
+        points = self.correct_selection
+        speed, acceleration = points.values('speed'), points.values('acceleration')
+        # Les points sans groupe (clé manquante, code -1) n'appartiennent à aucun groupe profilé : ils ne sont pas comparés entre eux
+        players_sample = np.flatnonzero((acceleration >= 5 - speed) & (points.values('group_codes') >= 0))
         
         # Verification si l'échantillon d'intérêt est vide
-        if players_sample.empty :
+        if len(players_sample) == 0 :
             return pd.DataFrame()
         
         # Detection des outliers grace a une methode de clustering
-        players_sample["label"] = players_sample.groupby('Player').apply(self.DBSCAN_clustering).T.values
-        outliers_DBSCAN = players_sample[players_sample.label == -1]
+        groups, speed, acceleration = points.values('group_codes')[players_sample], speed[players_sample], acceleration[players_sample]
+        if self.dbscan_engine == 'grid' :
+            # Seul le bruit (label -1) est identifié, les clusters ne sont pas numérotés
+            noise = dbscan_noise(groups, speed, acceleration, self.eps_DBSCAN, self.neighb_DBSCAN)
+        else :
+            # Un DBSCAN par groupe, sur ses points dans l'ordre de la table
+            noise = np.zeros(len(players_sample), dtype = bool)
+            groups = Groups(groups)
+            rows, speed, acceleration = groups.order, groups.sort(speed), groups.sort(acceleration)
+            for _, group in groups.slices() :
+                noise[rows[group]] = self.DBSCAN_clustering(speed[group], acceleration[group]) == -1
+        outliers_DBSCAN = players_sample[noise]
     
         # Suppression des outliers dans la base
-        outliers_DBSCAN_index = outliers_DBSCAN.index
-        self.correct_points = self.correct_points[~self.correct_points.index.isin(outliers_DBSCAN_index)]
+        keep = np.ones(len(points), dtype = bool)
+        keep[outliers_DBSCAN] = False
+        self.correct_selection = points.select(keep)
 
         # Sauvegarde de ces points
-        self.measurement_error = outliers_DBSCAN.copy()
-        return outliers_DBSCAN
+        self.measurement_error = points.take(outliers_DBSCAN).assign(label = -1)
+        return self.measurement_error
     
-    def DBSCAN_clustering(self, df : pd.DataFrame):
-        """Mise en forme de l'algorithme de DBSCAN pour l'intégrer à un groupby."""
-        clustering = DBSCAN(eps=self.eps_DBSCAN, min_samples=self.neighb_DBSCAN).fit(df[["Speed", "Acceleration"]])
-        return pd.Series(clustering.labels_, index = df.index)
+    def DBSCAN_clustering(self, speed : np.ndarray, acceleration : np.ndarray) -> np.ndarray:
+        """Labels de l'algorithme de DBSCAN sur les points d'un groupe (-1 : bruit)."""
+        # sklearn n'est chargé que si ce moteur est utilisé
+        from sklearn.cluster import DBSCAN
+        clustering = DBSCAN(eps=self.eps_DBSCAN, min_samples=self.neighb_DBSCAN).fit(np.column_stack([speed, acceleration]))
+        return clustering.labels_
 
-    def plot(self, file_name : str, display : bool = False) -> None:
+    def plot(self, file_name : str, display : bool = False, workers : int = 1) -> None:
         """Trace le nuage de points comprenant les deux types d'outliers (noir et rouge) et les données propres (bleu)."""
+        from rendering import render, show, split_by_group
+        # Découpage par groupe une seule fois
+        columns = ['Speed', 'Acceleration']
+        correct_points = split_by_group(self.correct_points, columns, self.group_by)
+        measurement_error = split_by_group(self.measurement_error, columns, self.group_by)
+        misuse_error = split_by_group(self.misuse_error, columns, self.group_by)
+        empty = {column : np.empty(0) for column in columns}
+
+        jobs = []
         for player in self.players :
+            player_correct_points = correct_points.get(player, empty)
+            # Points en rouge pour les outliers d'utilisation, en noir pour les outliers de mesure
+            player_measurement_error = measurement_error.get(player, empty)
+            player_misuse_error = misuse_error.get(player, empty)
+            jobs.append((group_name(player), {
+                'Speed' : player_correct_points['Speed'], 'Acceleration' : player_correct_points['Acceleration'],
+                'measurement_Speed' : player_measurement_error['Speed'], 'measurement_Acceleration' : player_measurement_error['Acceleration'],
+                'misuse_Speed' : player_misuse_error['Speed'], 'misuse_Acceleration' : player_misuse_error['Acceleration'],
+            }, f"./results/images/{file_name + '_' + group_name(player)}_outliers.png"))
 
-            # Nouvelle figure
-            plt.figure()
-
-            # Plot des données brutes avec les outliers detectés
-            player_correct_points = self.correct_points[self.correct_points.Player == player]
-            plt.scatter(player_correct_points.Speed, player_correct_points.Acceleration, alpha = 0.5, s = 20)
-            
-            # Points en rouge pour les outliers d'utilisation
-            if not self.measurement_error.empty :
-                player_measurement_error = self.measurement_error[self.measurement_error.Player == player]
-                if not player_measurement_error.empty :
-                    plt.scatter(player_measurement_error.Speed, player_measurement_error.Acceleration, alpha = 1, s = 20, c = "red")
-        
-            # Points en noir pour les outliers de mesure 
-            if not self.misuse_error.empty :
-                player_misuse_error = self.misuse_error[self.misuse_error.Player == player]
-                if not player_misuse_error.empty :
-                    plt.scatter(player_misuse_error.Speed, player_misuse_error.Acceleration, alpha = 1, s = 20, c = "black")
-                
-            plt.xlabel('Speed (m/s)')
-            plt.ylabel('Acceleration (m/s²)')
-            plt.xlim([0,11])
-            plt.ylim([0,11])
-            plt.title(f"Outliers : {player}")
-            plt.savefig(f"./results/images/{file_name + '_' + player}_outliers.png")
-            if display :
-                plt.show()    
\ No newline at end of file
+        paths = render('outliers', jobs, workers)
+        if display :
+            show(paths)
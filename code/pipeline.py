@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from outliers import Outliers
+from regression import Regression
+
+
+def split_players(points : pd.DataFrame, misuse_error : pd.DataFrame, dates : np.ndarray) -> list:
+    """Découpe les données nettoyées en un paquet de tableaux NumPy par joueur.
+    Les dates sont transmises sous forme de codes entiers vers `dates`."""
+    player_codes, players = pd.factorize(points.Player, sort = True)
+    date_codes = pd.Index(dates).get_indexer(points.Date)
+
+    # Un seul tri stable, puis découpage par bornes
+    order = np.argsort(player_codes, kind = 'stable')
+    bounds = np.searchsorted(player_codes[order], np.arange(len(players) + 1))
+
+    speed = points.Speed.to_numpy(dtype = float)[order]
+    acceleration = points.Acceleration.to_numpy(dtype = float)[order]
+    date_codes = date_codes[order]
+    index = points.index.to_numpy()[order]
+
+    shards = []
+    for k, player in enumerate(players) :
+        start, stop = bounds[k], bounds[k + 1]
+        player_misuse = misuse_error[misuse_error.Player == player] if not misuse_error.empty else misuse_error
+        shards.append({
+            'Player' : player,
+            'index' : index[start:stop],
+            'Speed' : speed[start:stop],
+            'Acceleration' : acceleration[start:stop],
+            'Date' : date_codes[start:stop],
+            'misuse_Speed' : player_misuse.Speed.to_numpy(dtype = float) if not player_misuse.empty else np.empty(0),
+            'misuse_Acceleration' : player_misuse.Acceleration.to_numpy(dtype = float) if not player_misuse.empty else np.empty(0),
+        })
+    return shards
+
+
+def profile_player(shard : dict, dates : np.ndarray, file_name : str, params : dict, plots : dict) -> tuple:
+    """Chaîne DBSCAN -> points à haute intensité -> régressions -> visuels pour un seul joueur.
+    Retourne les régressions linéaire et quantile du joueur, leurs diagnostics et le bootstrap (None si aucun point exploitable)."""
+    points = pd.DataFrame({
+        'Player' : shard['Player'],
+        'Speed' : shard['Speed'],
+        'Acceleration' : shard['Acceleration'],
+        'Date' : dates[shard['Date']],
+    }, index = shard['index'])
+
+    # Erreurs de mesure (les erreurs de mauvaise utilisation sont identifiées en amont, toutes dates confondues)
+    outliers = Outliers(points, nb_outlier = params['nb_outlier'], neighb_DBSCAN = params['neighb_DBSCAN'], eps_DBSCAN = params['eps_DBSCAN'], dbscan_engine = params['dbscan_engine'])
+    if len(shard['misuse_Speed']) :
+        outliers.misuse_error = pd.DataFrame({'Player' : shard['Player'], 'Speed' : shard['misuse_Speed'], 'Acceleration' : shard['misuse_Acceleration']})
+    outliers.measurement_error_identification()
+    if plots['outliers'] :
+        outliers.plot(file_name)
+
+    if outliers.correct_selection.empty :
+        return None
+
+    # Régressions
+    regression = Regression(outliers.correct_selection, dv = params['dv'], n_max = params['n_max'], quantile_engine = params['quantile_engine'])
+    regression.intensity_max_identification()
+    regression.regression_lineaire()
+    if plots['linear_regression'] :
+        regression.plot_linear(file_name)
+    regression.regression_quantile()
+    if plots['quantile_regression'] :
+        regression.plot_quantile(file_name)
+    if params.get('n_resamples') :
+        regression.bootstrap(params['n_resamples'], seed = params['seed'])
+
+    return regression.players_linear_regression, regression.players_quantile_regression, regression.diagnostics, regression.players_bootstrap
+
+
+def run(points : pd.DataFrame, file_name : str, workers : int = 1, params : dict = None, plots : dict = None) -> Regression:
+    """Profilage accélération-vitesse joueur par joueur sur `workers` processus.
+    Le résultat ne dépend pas du nombre de processus."""
+    params = {'nb_outlier' : 10, 'neighb_DBSCAN' : 3, 'eps_DBSCAN' : 0.5, 'dbscan_engine' : 'sklearn', 'dv' : 0.3, 'n_max' : 2, 'quantile_engine' : 'exact', 'n_resamples' : 0, 'seed' : 0, **(params or {})}
+    plots = {'outliers' : False, 'linear_regression' : False, 'quantile_regression' : False, **(plots or {})}
+
+    # La règle de mauvaise utilisation supprime des dates pour tous les joueurs : elle reste globale
+    outliers = Outliers(points, nb_outlier = params['nb_outlier'], neighb_DBSCAN = params['neighb_DBSCAN'], eps_DBSCAN = params['eps_DBSCAN'], dbscan_engine = params['dbscan_engine'])
+    outliers.misuse_error_identification()
+
+    dates = outliers.correct_points.Date.unique()
+    shards = split_players(outliers.correct_points, outliers.misuse_error, dates)
+
+    n = len(shards)
+    arguments = ([dates] * n, [file_name] * n, [params] * n, [plots] * n)
+    if workers > 1 :
+        with ProcessPoolExecutor(max_workers = workers) as executor :
+            results = list(executor.map(profile_player, shards, *arguments))
+    else :
+        results = list(map(profile_player, shards, *arguments))
+    results = [result for result in results if result is not None]
+
+    # Fusion dans l'ordre des joueurs, comme un groupby('Player')
+    regression = Regression(pd.DataFrame({'Player' : [shard['Player'] for shard in shards]}), dv = params['dv'], n_max = params['n_max'], quantile_engine = params['quantile_engine'])
+    if results :
+        regression.players_linear_regression = pd.concat([linear for linear, _, _, _ in results])
+        regression.players_quantile_regression = pd.concat([quantile for _, quantile, _, _ in results])
+        regression.players_bootstrap = pd.concat([bootstrap for _, _, _, bootstrap in results])
+        for _, _, diagnostics, _ in results :
+            for model, players in diagnostics.items() :
+                regression.diagnostics[model].update(players)
+    return regression
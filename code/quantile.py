@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Quantiles utilisés pour le profil accélération-vitesse
+QUANTILES = np.arange(.05, .96, .01)
+# Au-delà de ce nombre de points, le moteur exact (coût en n³ : couples de points × résidus) est plus lent que statsmodels
+EXACT_MAX_POINTS = 400
+
+
+def quantile_regression(x : np.ndarray, y : np.ndarray, quantiles : np.ndarray = QUANTILES, chunk_size : int = 2**20) -> tuple:
+    """Régression quantile exacte du modèle y = a + b * x pour toute une grille de quantiles.
+
+    Avec deux paramètres, une solution optimale du programme linéaire passe par
+    deux points de l'échantillon. On énumère donc tous les couples de points
+    (d'abscisses distinctes), on calcule une seule fois la somme des résidus
+    positifs et négatifs de chaque droite candidate, puis la perte de chaque
+    quantile q vaut q * positifs + (1 - q) * négatifs.
+
+    Retourne les tableaux (a, b) de la taille de `quantiles`."""
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+    quantiles = np.asarray(quantiles, dtype = float)
+
+    # Droites candidates passant par deux points d'abscisses différentes
+    i, j = np.triu_indices(len(x), 1)
+    keep = x[i] != x[j]
+    i, j = i[keep], j[keep]
+    if len(i) == 0 :
+        return np.full(len(quantiles), np.nan), np.full(len(quantiles), np.nan)
+
+    slopes = (y[j] - y[i]) / (x[j] - x[i])
+    intercepts = y[i] - slopes * x[i]
+
+    # Meilleure droite par quantile, calculée par blocs pour borner la mémoire
+    best_loss = np.full(len(quantiles), np.inf)
+    best_pair = np.zeros(len(quantiles), dtype = int)
+    step = max(1, chunk_size // max(len(x), 1))
+    for start in range(0, len(slopes), step):
+        a = intercepts[start:start + step, None]
+        b = slopes[start:start + step, None]
+        residuals = y[None, :] - (a + b * x[None, :])
+        positive = np.where(residuals > 0, residuals, 0).sum(axis = 1)
+        negative = - np.where(residuals < 0, residuals, 0).sum(axis = 1)
+
+        loss = quantiles[:, None] * positive[None, :] + (1 - quantiles[:, None]) * negative[None, :]
+        chunk_best = loss.argmin(axis = 1)
+        chunk_loss = loss[np.arange(len(quantiles)), chunk_best]
+
+        better = chunk_loss < best_loss
+        best_loss[better] = chunk_loss[better]
+        best_pair[better] = chunk_best[better] + start
+
+    return intercepts[best_pair], slopes[best_pair]
@@ -6,199 +6,267 @@ Created on Tue Mar  2 11:25:34 2023
 """
 
 import pandas as pd
-from matplotlib import pyplot as plt
-from sklearn.linear_model import LinearRegression
 import warnings 
-import statsmodels.formula.api as smf
 
 import numpy as np 
 
+from quantile import EXACT_MAX_POINTS, QUANTILES, quantile_regression
+from columns import PointSelection, Groups, dense_rank, group_codes, group_name
+
+# sklearn, statsmodels et matplotlib (rendering) ne sont importés que par les étapes qui les utilisent
+
+# Nombre maximal d'itérations de statsmodels (valeur par défaut de QuantReg.fit)
+MAX_ITER = 1000
+
 
 class Regression():
-    def __init__(self, points : pd.DataFrame, dv : float = 0.3, n_max : int = 2) -> None:
+    def __init__(self, points, dv : float = 0.3, n_max : int = 2, quantile_engine : str = 'exact', group_by : list = ('Player',)) -> None:
+        """`points` : DataFrame ou PointSelection (cf columns.py), partagée sans copie.
+        `group_by` : colonnes des groupes profilés (ex : ['Player', 'Drill']) si `points` est un DataFrame, sinon ceux de la sélection."""
         # Ensemble des points nettoyés 
-        self.points = points.copy()
+        self.selection = PointSelection.of(points, group_by)
+        self.group_by = self.selection.columns.keys
         self.high_intensity_points = pd.DataFrame()
+        # Rang des accélérations par groupe et interval dv, aligné sur la sélection
+        self.rank = None
 
         # Paramètres de la méthode 
         self.dv = dv # Petit interval de vitesse
         self.n_max = n_max # Nombre de points à sélectionner par interval de vitesse dv
+        if quantile_engine not in ['exact', 'statsmodels'] :
+            raise ValueError(f"Moteur de régression quantile inconnu : {quantile_engine}")
+        self.quantile_engine = quantile_engine # 'exact' (énumération des couples de points) ou 'statsmodels'
 
-        # Sportifs dans les données
-        self.players = points.Player.unique()
+        # Sportifs (ou groupes) dans les données
+        self.players = self.selection.groups()
 
-        # Régressions par sportif
+        # Régressions par sportif (ou groupe)
         self.players_linear_regression = pd.DataFrame()
         self.players_quantile_regression = pd.DataFrame()
+        # Intervalles de confiance bootstrap de a0 et s0
+        self.players_bootstrap = pd.DataFrame()
+
+        # Diagnostics des régressions par sportif (qualité, itérations, convergence)
+        self.diagnostics = {'linear_regression' : {}, 'quantile_regression' : {}, 'bootstrap' : {}}
+
+    @property
+    def points(self) -> pd.DataFrame:
+        """Points nettoyés, copiés depuis la table d'origine à la première demande."""
+        return self.selection.frame
 
     def intensity_max_identification(self) -> pd.DataFrame:
         """Identification des points à maximum intensité selon la méthode de JB Morin"""
+        self.rank_acceleration()
+        return self.select_high_intensity()
+
+    def rank_acceleration(self) -> np.ndarray:
+        """Rang des accélérations par groupe et interval dv (ne dépend pas de n_max)."""
+        players, speed, acceleration = self.selection.values('group_codes'), self.selection.values('speed'), self.selection.values('acceleration')
         # ID des intervals dv
-        self.points.loc[:, "dv"] = self.points.Speed // self.dv
-        # Plus grandes valeurs d'accélération par interval
-        self.points.loc[:, "rank_Acceleration_dv"] = self.points.groupby(['Player', 'dv']).Acceleration.rank(method = 'dense', ascending = False)
+        dv = speed // self.dv
+        # Plus grandes valeurs d'accélération par interval (rang indéfini si le groupe, l'interval ou l'accélération l'est)
+        valid = (players >= 0) & ~np.isnan(dv) & ~np.isnan(acceleration)
+        if valid.all() :
+            self.rank = dense_rank([players, dv], acceleration)
+        else :
+            self.rank = np.full(len(self.selection), np.nan)
+            self.rank[valid] = dense_rank([players[valid], dv[valid]], acceleration[valid])
+        return self.rank
+
+    def select_high_intensity(self) -> pd.DataFrame:
+        """Points à haute intensité parmi les points classés par rank_acceleration."""
         # Points à intensité maximal
-        high_intensity_points = self.points[self.points.rank_Acceleration_dv <= self.n_max]
+        candidates = self.rank <= self.n_max
+        selection = self.selection.select(candidates)
+        rank = self.rank[candidates]
+        players, speed, acceleration = selection.values('group_codes'), selection.values('speed'), selection.values('acceleration')
+
+        # LE point à intensité maximal de chaque groupe
+        groups = Groups(players)
+        max_Acceleration = groups.broadcast(groups.reduce(np.maximum, acceleration), len(players))
+        at_max = acceleration == max_Acceleration
+        max_Speed_at_max_Acceleration = groups.broadcast(groups.reduce(np.maximum, np.where(at_max, speed, - np.inf)), len(players))
 
-        # LE point à intensité maximal
-        high_intensity_points.loc[:, "max_Acceleration"] = high_intensity_points.groupby(['Player']).Acceleration.transform('max')
-        max_Speed_at_max_Acceleration = high_intensity_points.query('Acceleration == max_Acceleration').groupby(['Player']).Speed.max()
-        max_Speed_at_max_Acceleration = pd.DataFrame(max_Speed_at_max_Acceleration.values, columns = ['max_Speed_at_max_Acceleration'], index = max_Speed_at_max_Acceleration.index)
+        # Groupes dans leur ordre d'apparition (ordre de la fusion sur les clés)
+        first = pd.unique(players)
+        appearance = np.empty(len(self.selection.columns.groups), dtype = np.int64)
+        appearance[first] = np.arange(len(first))
+        order = np.argsort(appearance[players], kind = 'stable')
 
         # La regression se fera uniquement sur les points de vitesse supérieur à ce dernier point
-        high_intensity_points = high_intensity_points.merge(max_Speed_at_max_Acceleration, on = 'Player')
-        high_intensity_points = high_intensity_points.query('Speed >= max_Speed_at_max_Acceleration')
-        self.high_intensity_points = high_intensity_points.copy()
-        return high_intensity_points
+        keep = speed[order] >= max_Speed_at_max_Acceleration[order]
+        rows = order[keep]
+        self.high_intensity_points = selection.take(rows).assign(
+            dv = speed[rows] // self.dv,
+            rank_Acceleration_dv = rank[rows],
+            max_Acceleration = max_Acceleration[rows],
+            max_Speed_at_max_Acceleration = max_Speed_at_max_Acceleration[rows],
+        )
+        self.high_intensity_points.index = pd.Index(np.flatnonzero(keep))
+        return self.high_intensity_points
     
+    def split_high_intensity(self) -> tuple:
+        """Points à haute intensité rangés par groupe (un seul tri), pour exécuter les régressions sur des tranches contiguës.
+        Retourne le moteur de groupes, l'index des groupes (comme un groupby sur `group_by`), les vitesses et accélérations rangées."""
+        codes, labels = group_codes(self.high_intensity_points, self.group_by)
+        groups = Groups(codes)
+        index = labels.take(groups.codes)
+        speed = groups.sort(self.high_intensity_points.Speed.to_numpy(dtype = float))
+        acceleration = groups.sort(self.high_intensity_points.Acceleration.to_numpy(dtype = float))
+        return groups, index, speed, acceleration
+
+    def empty_index(self, quantiles : bool = False) -> pd.Index:
+        """Index sans groupe, avec les niveaux des résultats (clés `group_by`, puis n° de quantile)."""
+        names = self.group_by + [None] if quantiles else self.group_by
+        return pd.MultiIndex.from_arrays([[]] * len(names), names = names) if len(names) > 1 else pd.Index([], name = names[0])
+
     def regression_lineaire(self):
         """Calcul de la régression linéaire sur les points à haute intensité"""
-        # Calcul des régressions linéaires sportif par sportif
-        self.players_linear_regression = pd.DataFrame(self.high_intensity_points.groupby('Player').apply(self.group_linear_regression), columns = ['linear_regression'])
+        # Calcul des régressions linéaires groupe par groupe
+        columns = ["a0 : Regression linéaire", "s0 : Regression linéaire"]
+        if self.high_intensity_points.empty :
+            self.players_linear_regression = pd.DataFrame(columns = columns, index = self.empty_index(), dtype = float)
+            return self.players_linear_regression
+        groups, index, speed, acceleration = self.split_high_intensity()
+        models = [self.group_linear_regression(group, speed[rows], acceleration[rows]) for group, (_, rows) in zip(index, groups.slices())]
 
         # Valeurs intéressantes
         # Calcul de a0 et s0 selon les valeurs de la regression lineaire
-        self.players_linear_regression.loc[:, "a0 : Regression linéaire"] = self.players_linear_regression.linear_regression.apply(lambda x : x.intercept_[0])
-        self.players_linear_regression.loc[:, "s0 : Regression linéaire"] = self.players_linear_regression.linear_regression.apply(lambda x : - x.intercept_[0] / x.coef_[0,0])
-
-        self.players_linear_regression = self.players_linear_regression.drop(columns = ['linear_regression'])
+        # Une régression de mauvaise qualité n'est pas ajustée : a0 et s0 ne sont pas définis
+        self.players_linear_regression = pd.DataFrame({
+            columns[0] : [model.intercept_[0] if hasattr(model, 'coef_') else np.nan for model in models],
+            columns[1] : [- model.intercept_[0] / model.coef_[0,0] if hasattr(model, 'coef_') else np.nan for model in models],
+        }, index = index)
         return self.players_linear_regression
     
-    def group_linear_regression(self, df):
-        """Régression linéaire à exécuter dans un groupby"""
-        y = df[['Acceleration']]
-        X = df[['Speed']]
+    def group_linear_regression(self, group, speed : np.ndarray, acceleration : np.ndarray):
+        """Régression linéaire sur les points à haute intensité d'un groupe"""
+        from sklearn.linear_model import LinearRegression
+        y = acceleration.reshape(-1, 1)
+        X = speed.reshape(-1, 1)
         linear_regression = LinearRegression().fit(X, y)
-        if linear_regression.score(X, y) <= 0.5 :
-            player = df.player.unique()[0]
-            warnings.warn(f"La regression linéaire du joueur {player} n'est pas de qualité. Veuillez vérifier les données")
+        score = linear_regression.score(X, y)
+        self.diagnostics['linear_regression'][group] = {'n_points' : len(speed), 'r2' : score, 'fitted' : bool(score > 0.5)}
+        if score <= 0.5 :
+            warnings.warn(f"La regression linéaire du joueur {group_name(group)} n'est pas de qualité. Veuillez vérifier les données")
             return LinearRegression()
         return linear_regression
     
-    def plot_linear(self, file_name : str, display : bool = False):
+    def plot_linear(self, file_name : str, display : bool = False, workers : int = 1):
         """Créer un visuel de la régression lineaire."""
-        for player in self.players :
-
-            player_points = self.points[self.points.Player == player]
-            player_high_intensity = self.high_intensity_points[self.high_intensity_points.Player == player]
+        from rendering import render, show
+        jobs = []
+        for player, data in self.plot_data().items() :
             player_regression = self.players_linear_regression.loc[player, :]
 
-            # Nouvelle figure
-            plt.figure()
-        
-            # Plot des données brutes
-            plt.scatter(player_points.Speed, player_points.Acceleration, alpha = 0.5, s = 20)
-            
+            # Trace droite et écriture des valeurs s0 et a0
+            data['s0'] = player_regression["s0 : Regression linéaire"]
+            data['a0'] = player_regression["a0 : Regression linéaire"]
+            data['a0_text'] = f'a0 = {data["a0"]:.2f} m/s²'
+            data['s0_text'] = f's0 = {data["s0"]:.2f} m/s'
+            jobs.append((group_name(player), data, f"./results/images/{file_name + '_' + group_name(player)}_Linear_Regression.png"))
+
+        paths = render('linear', jobs, workers)
+        if display :
+            show(paths)
+
+    def plot_data(self) -> dict:
+        """Nuage de points, points à haute intensité et point de puissance maximale de chaque groupe, découpés une seule fois."""
+        from rendering import split_by_group
+        points = split_by_group(self.points, ['Speed', 'Acceleration'], self.group_by)
+        high_intensity_points = split_by_group(self.high_intensity_points, ['Speed', 'Acceleration', 'max_Acceleration', 'max_Speed_at_max_Acceleration'], self.group_by)
+
+        plot_data = {}
+        for player in self.players :
+            player_points = points[player]
             # Points en rouge les points à haute intensité
-            if not player_high_intensity.empty :
-                plt.scatter(player_high_intensity.Speed, player_high_intensity.Acceleration, alpha = 1, s = 20, c = "red")
-            else : 
+            if player not in high_intensity_points :
                 raise ValueError("Des points à haute intensité doivent être identifiés.")
-            
-            # Point vert pour la valeur de puissance maximale liberée
-            Amax = player_high_intensity.max_Acceleration.iloc[0]
-            Vmax = player_high_intensity.max_Speed_at_max_Acceleration.iloc[0]
-            plt.scatter(Vmax, Amax, alpha = 1, s = 50, c = "green")
-
-            # Trace droite
-            s0 = player_regression[["s0 : Regression linéaire"]].iloc[0]
-            a0 = player_regression[["a0 : Regression linéaire"]].iloc[0]
-            droite = np.array([[0,s0], [a0, 0]], dtype = object)
-            plt.plot(droite[0], droite[1], color='red')
-            # Ecriture des valeurs s0 et a0
-            plt.figtext(0.3, 0.8, f'a0 = {a0:.2f} m/s²', ha="center", color = 'red', fontsize=10, bbox={"facecolor":"white", "alpha":0.5, "pad":5})
-            plt.figtext(0.8, 0.4, f's0 = {s0:.2f} m/s', ha="center", color = 'red', fontsize=10, bbox={"facecolor":"white", "alpha":0.5, "pad":5})
-    
-            # Axes et titre du graph
-            plt.xlabel('Speed (m/s)')
-            plt.ylabel('Acceleration (m/s²)')
-            plt.xlim([0,11])
-            plt.ylim([0,11])
-            plt.title(f"Régression linéaire : {player}")
-            plt.savefig(f"./results/images/{file_name + '_' + player}_Linear_Regression.png")
-            if display :
-                plt.show()   
-    
+            player_high_intensity = high_intensity_points[player]
+
+            plot_data[player] = {
+                'Speed' : player_points['Speed'], 'Acceleration' : player_points['Acceleration'],
+                'high_Speed' : player_high_intensity['Speed'], 'high_Acceleration' : player_high_intensity['Acceleration'],
+                # Point vert pour la valeur de puissance maximale liberée
+                'Amax' : player_high_intensity['max_Acceleration'][0], 'Vmax' : player_high_intensity['max_Speed_at_max_Acceleration'][0],
+            }
+        return plot_data
+
     def regression_quantile(self):
         """Calcul de régressions quantiles sur les points à haute intensité"""
-        # Calcul des régressions linéaires sportif par sportif
-        self.players_quantile_regression = self.high_intensity_points.groupby('Player').apply(self.group_quantile_regression)
+        # Calcul des régressions quantiles groupe par groupe
+        if self.high_intensity_points.empty :
+            self.players_quantile_regression = pd.DataFrame(columns = ['q', 'a0', 's0'], index = self.empty_index(quantiles = True), dtype = float)
+            return self.players_quantile_regression
+        groups, index, speed, acceleration = self.split_high_intensity()
+        models = [self.group_quantile_regression(group, speed[rows], acceleration[rows]) for group, (_, rows) in zip(index, groups.slices())]
+        # Index (groupe, n° de quantile), comme un groupby.apply
+        self.players_quantile_regression = pd.concat(models, keys = index, names = self.group_by + [None])
         return self.players_quantile_regression 
         
-    def group_quantile_regression(self, df):
-        """Régression quantile à exécuter dans un groupby"""
-        model = smf.quantreg('Acceleration ~ Speed', df[['Speed', 'Acceleration']].astype(float))
-        quantiles = np.arange(.05, .96, .01)
-        models = pd.DataFrame([self.model_fit(q, model) for q in quantiles], columns=['q', 'a0', 'b'])
+    def group_quantile_regression(self, group, speed : np.ndarray, acceleration : np.ndarray):
+        """Régressions quantiles sur les points à haute intensité d'un groupe.
+        Le moteur exact laisse la place à statsmodels au-delà de EXACT_MAX_POINTS points (cf diagnostics, 'engine')."""
+        if self.quantile_engine == 'exact' and len(speed) <= EXACT_MAX_POINTS :
+            # Toute la grille de quantiles en une seule passe
+            a0, b = quantile_regression(speed, acceleration, QUANTILES)
+            models = pd.DataFrame({'q' : QUANTILES, 'a0' : a0, 'b' : b})
+            # Solution exacte : toutes les droites passant par deux points sont évaluées
+            self.diagnostics['quantile_regression'][group] = {'engine' : 'exact', 'n_points' : len(speed), 'candidates' : len(speed) * (len(speed) - 1) // 2, 'converged' : True}
+        else :
+            import statsmodels.formula.api as smf
+            model = smf.quantreg('Acceleration ~ Speed', pd.DataFrame({'Speed' : speed, 'Acceleration' : acceleration}))
+            models = pd.DataFrame([self.model_fit(q, model) for q in QUANTILES], columns=['q', 'a0', 'b', 'iterations'])
+            self.diagnostics['quantile_regression'][group] = {'engine' : 'statsmodels', 'requested_engine' : self.quantile_engine, 'n_points' : len(speed), 'max_iterations' : int(models.iterations.max()),
+                                                              'converged' : bool((models.iterations < MAX_ITER).all()), 'not_converged_q' : models.q[models.iterations >= MAX_ITER].round(2).tolist()}
         models.loc[:, "s0"] = - models.a0 / models.b
         return models[['q', 'a0', 's0']]
     
     def model_fit(self, q, model):
-        results = model.fit(q = q)
-        return q, results.params['Intercept'], results.params['Speed']
+        results = model.fit(q = q, max_iter = MAX_ITER)
+        return q, results.params['Intercept'], results.params['Speed'], results.iterations
     
+    def bootstrap(self, n_resamples : int = 1000, level : float = 0.95, seed : int = 0, workers : int = 1) -> pd.DataFrame:
+        """Intervalles de confiance de a0 et s0 par rééchantillonnage des points à haute intensité (cf bootstrap.py).
+        Contrairement à std_a0 et std_s0 (dispersion entre quantiles), il s'agit d'une incertitude d'échantillonnage.
+        Les intervalles quantiles ne sont calculés que jusqu'à EXACT_MAX_POINTS points par groupe (cf diagnostics, 'quantile_engine')."""
+        from bootstrap import bootstrap_profiles
+        self.players_bootstrap, self.diagnostics['bootstrap'] = bootstrap_profiles(self.high_intensity_points, n_resamples, level, seed, workers, keys = self.group_by)
+        return self.players_bootstrap
+
     def compute_quantile_a0_s0(self):
         # Valeurs intéressantes
         # Calcul de a0 et s0 selon les valeurs de la regression quantile
-        df_a0 = self.players_quantile_regression.groupby(['Player']).a0.agg({'mean', 'std'}).rename(columns = {'mean' : 'a0 : Regression quantile', 'std' : 'std_a0'})
-        df_s0 = self.players_quantile_regression.groupby(['Player']).s0.agg({'mean', 'std'}).rename(columns = {'mean' : 's0 : Regression quantile', 'std' : 'std_s0'})
+        df_a0 = self.players_quantile_regression.groupby(level = self.group_by).a0.agg(['mean', 'std']).rename(columns = {'mean' : 'a0 : Regression quantile', 'std' : 'std_a0'})
+        df_s0 = self.players_quantile_regression.groupby(level = self.group_by).s0.agg(['mean', 'std']).rename(columns = {'mean' : 's0 : Regression quantile', 'std' : 'std_s0'})
         return pd.concat([df_a0, df_s0], axis = 1)
     
-    def plot_quantile(self, file_name : str, display : bool = False):
+    def plot_quantile(self, file_name : str, display : bool = False, workers : int = 1):
         """Créer un visuel de la régression lineaire."""
-        for player in self.players :
-
-            player_points = self.points[self.points.Player == player]
-            player_high_intensity = self.high_intensity_points[self.high_intensity_points.Player == player]
+        from rendering import render, show
+        quantile = self.compute_quantile_a0_s0()
+        jobs = []
+        for player, data in self.plot_data().items() :
             player_quantile_all = self.players_quantile_regression.loc[player, :]
-            player_quantile = self.compute_quantile_a0_s0().loc[player, :]
-
-            # Nouvelle figure
-            plt.figure()
-        
-            # Plot des données brutes
-            plt.scatter(player_points.Speed, player_points.Acceleration, alpha = 0.5, s = 20)
-            
-            # Points en rouge les points à haute intensité
-            if not player_high_intensity.empty :
-                plt.scatter(player_high_intensity.Speed, player_high_intensity.Acceleration, alpha = 1, s = 20, c = "red")
-            else : 
-                raise ValueError("Des points à haute intensité doivent être identifiés.")
-            
-            # Point vert pour la valeur de puissance maximale liberée
-            Amax = player_high_intensity.max_Acceleration.iloc[0]
-            Vmax = player_high_intensity.max_Speed_at_max_Acceleration.iloc[0]
-            plt.scatter(Vmax, Amax, alpha = 1, s = 50, c = "green")
+            player_quantile = quantile.loc[player, :]
 
             # Trace multiples droites
-            for q in np.arange(.05, .96, .1):
-                # Trace droite
-                s0 = player_quantile_all.loc[player_quantile_all.q == q, 's0']
-                a0 = player_quantile_all.loc[player_quantile_all.q == q, 'a0']
-                droite = np.array([[0,s0], [a0, 0]], dtype = object)
-                plt.plot(droite[0], droite[1], linestyle='dotted', color='grey')
-
-            # Trace droite
-            s0 = player_quantile[["s0 : Regression quantile"]].iloc[0]
-            a0 = player_quantile[["a0 : Regression quantile"]].iloc[0]
-            std_s0 = player_quantile[["std_s0"]].iloc[0]
-            std_a0 = player_quantile[["std_a0"]].iloc[0]
-
-            droite = np.array([[0,s0], [a0, 0]], dtype = object)
-            plt.plot(droite[0], droite[1], color='red')
-            # Ecriture des valeurs s0 et a0
-            plt.figtext(0.3, 0.8, f'a0 = {a0:.2f} ± {std_a0:.2f} m/s² ', ha="center", color = 'red', fontsize=10, bbox={"facecolor":"white", "alpha":0.5, "pad":5})
-            plt.figtext(0.8, 0.4, f's0 = {s0:.2f} ± {std_s0:.2f} m/s', ha="center", color = 'red', fontsize=10, bbox={"facecolor":"white", "alpha":0.5, "pad":5})
-
-            # Axes et titre du graph
-            plt.xlabel('Speed (m/s)')
-            plt.ylabel('Acceleration (m/s²)')
-            plt.xlim([0,11])
-            plt.ylim([0,11])
-            plt.title(f"Acceleration - Speed Profil : {player}")
-            plt.savefig(f"./results/images/{file_name + '_' + player}_Quantile_Regression.png")
-            if display :
-                plt.show()   
+            player_quantile_all = player_quantile_all[player_quantile_all.q.isin(np.arange(.05, .96, .1))]
+            data['quantile_a0'] = player_quantile_all.a0.to_numpy()
+            data['quantile_s0'] = player_quantile_all.s0.to_numpy()
+
+            # Trace droite et écriture des valeurs s0 et a0
+            data['s0'] = player_quantile["s0 : Regression quantile"]
+            data['a0'] = player_quantile["a0 : Regression quantile"]
+            std_s0 = player_quantile["std_s0"]
+            std_a0 = player_quantile["std_a0"]
+            data['a0_text'] = f'a0 = {data["a0"]:.2f} ± {std_a0:.2f} m/s² '
+            data['s0_text'] = f's0 = {data["s0"]:.2f} ± {std_s0:.2f} m/s'
+            jobs.append((group_name(player), data, f"./results/images/{file_name + '_' + group_name(player)}_Quantile_Regression.png"))
+
+        paths = render('quantile', jobs, workers)
+        if display :
+            show(paths)
 
     def save(self, file_name : str):
         """Écrit les résultats des régressions dans un dataframe"""
@@ -211,4 +279,4 @@ class Regression():
         elif self.players_quantile_regression.empty : 
             self.players_linear_regression.to_csv(f"./results/ProfilAV_insitu_{file_name}.csv")
         else :
-            pd.concat([self.players_linear_regression, self.compute_quantile_a0_s0()], axis = 1).to_csv(f"./results/ProfilAV_insitu_{file_name}.csv")
\ No newline at end of file
+            pd.concat([self.players_linear_regression, self.compute_quantile_a0_s0(), self.players_bootstrap], axis = 1).to_csv(f"./results/ProfilAV_insitu_{file_name}.csv")
\ No newline at end of file
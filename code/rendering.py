@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from columns import Groups, group_codes
+
+# Boîte des valeurs a0 et s0
+BBOX = {"facecolor":"white", "alpha":0.5, "pad":5}
+
+
+def split_by_group(df : pd.DataFrame, columns : list, keys : list = ('Player',)) -> dict:
+    """Découpe une fois pour toutes les colonnes `columns` par groupe (colonnes `keys`) : {groupe : {colonne : tableau}}."""
+    if df.empty :
+        return {}
+    codes, labels = group_codes(df, list(keys))
+    groups = Groups(codes)
+    values = {column : groups.sort(df[column].to_numpy()) for column in columns}
+    return {labels[code] : {column : values[column][rows] for column in columns} for code, rows in groups.slices()}
+
+
+class Canvas():
+    """
+    Figure Agg réutilisée d'un joueur à l'autre : les axes et les artistes sont créés une seule fois,
+    seules leurs données changent avant chaque enregistrement.
+    """
+    def __init__(self) -> None:
+        self.figure = Figure()
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+        # Nuage de points brut
+        self.points = self.ax.scatter([], [], alpha = 0.5, s = 20, c = "C0")
+
+    def axes(self, title : str) -> None:
+        """Axes et titre du graph"""
+        self.ax.set_xlabel('Speed (m/s)')
+        self.ax.set_ylabel('Acceleration (m/s²)')
+        self.ax.set_xlim([0,11])
+        self.ax.set_ylim([0,11])
+        self.title = title
+
+    def save(self, player : str, path : str) -> None:
+        self.ax.set_title(self.title.format(player = player))
+        self.figure.savefig(path)
+
+    @staticmethod
+    def offsets(x, y) -> np.ndarray:
+        return np.column_stack([np.asarray(x, dtype = float), np.asarray(y, dtype = float)]) if len(x) else np.empty((0, 2))
+
+
+class OutliersCanvas(Canvas):
+    """Nuage de points avec les deux types d'outliers (cf Outliers.plot)."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.measurement_error = self.ax.scatter([], [], alpha = 1, s = 20, c = "red")
+        self.misuse_error = self.ax.scatter([], [], alpha = 1, s = 20, c = "black")
+        self.axes("Outliers : {player}")
+
+    def draw(self, player : str, data : dict, path : str) -> None:
+        self.points.set_offsets(self.offsets(data['Speed'], data['Acceleration']))
+        self.measurement_error.set_offsets(self.offsets(data['measurement_Speed'], data['measurement_Acceleration']))
+        self.misuse_error.set_offsets(self.offsets(data['misuse_Speed'], data['misuse_Acceleration']))
+        self.save(player, path)
+
+
+class RegressionCanvas(Canvas):
+    """Nuage de points, points à haute intensité et droite a0 - s0 (cf Regression.plot_linear et plot_quantile)."""
+    def __init__(self, title : str, n_quantiles : int = 0) -> None:
+        super().__init__()
+        self.high_intensity = self.ax.scatter([], [], alpha = 1, s = 20, c = "red")
+        self.max_point = self.ax.scatter([], [], alpha = 1, s = 50, c = "green")
+        self.quantiles = [self.ax.plot([], [], linestyle='dotted', color='grey')[0] for _ in range(n_quantiles)]
+        self.line = self.ax.plot([], [], color='red')[0]
+        self.a0_text = self.figure.text(0.3, 0.8, '', ha="center", color = 'red', fontsize=10, bbox=BBOX)
+        self.s0_text = self.figure.text(0.8, 0.4, '', ha="center", color = 'red', fontsize=10, bbox=BBOX)
+        self.axes(title)
+
+    def draw(self, player : str, data : dict, path : str) -> None:
+        self.points.set_offsets(self.offsets(data['Speed'], data['Acceleration']))
+        self.high_intensity.set_offsets(self.offsets(data['high_Speed'], data['high_Acceleration']))
+        self.max_point.set_offsets(self.offsets([data['Vmax']], [data['Amax']]))
+        for line, a0, s0 in zip(self.quantiles, data.get('quantile_a0', []), data.get('quantile_s0', [])) :
+            line.set_data([0, s0], [a0, 0])
+        self.line.set_data([0, data['s0']], [data['a0'], 0])
+        self.a0_text.set_text(data['a0_text'])
+        self.s0_text.set_text(data['s0_text'])
+        self.save(player, path)
+
+
+def render_chunk(kind : str, jobs : list) -> None:
+    """Rendu d'une liste de (joueur, données, chemin) sur une seule figure."""
+    if kind == 'outliers' :
+        canvas = OutliersCanvas()
+    elif kind == 'linear' :
+        canvas = RegressionCanvas("Régression linéaire : {player}")
+    else :
+        canvas = RegressionCanvas("Acceleration - Speed Profil : {player}", n_quantiles = len(jobs[0][1]['quantile_a0']) if jobs else 0)
+    for player, data, path in jobs :
+        canvas.draw(player, data, path)
+
+
+def render(kind : str, jobs : list, workers : int = 1) -> list:
+    """Rendu des images `kind` ('outliers', 'linear' ou 'quantile'), éventuellement réparti sur `workers` processus.
+    Retourne les chemins des images."""
+    if workers > 1 and len(jobs) > 1 :
+        chunks = [jobs[k::workers] for k in range(workers) if jobs[k::workers]]
+        with ProcessPoolExecutor(max_workers = len(chunks)) as executor :
+            list(executor.map(render_chunk, [kind] * len(chunks), chunks))
+    else :
+        render_chunk(kind, jobs)
+    return [path for _, _, path in jobs]
+
+
+def show(paths : list) -> None:
+    """Affiche des images déjà enregistrées."""
+    from matplotlib import pyplot as plt
+    for path in paths :
+        plt.figure()
+        plt.imshow(plt.imread(path))
+        plt.axis('off')
+        plt.show()
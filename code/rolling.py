@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from outliers import Outliers
+from regression import Regression
+
+
+class RollingProfile():
+    """
+    Profils accélération-vitesse sur une fenêtre glissante des `window` dernières séances (dates), avancée d'une date à la fois.
+    Chaque date est résumée une seule fois, avec le même résumé fusionnable que ProfileStore :
+        - tous les points de la zone étudiée par le DBSCAN (Acceleration >= 5 - Speed) ;
+        - ailleurs, les n_max plus grandes accélérations par (joueur, interval dv) ;
+        - une date supprimée par la règle de mauvaise utilisation garde sa place dans la fenêtre, sans aucun point.
+    À chaque pas, seuls les joueurs présents dans la date ajoutée ou retirée sont recalculés,
+    et leurs régressions ne sont refaites que si leurs points à haute intensité ont changé.
+    """
+    def __init__(self, window : int, dv : float = 0.3, n_max : int = 2, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float = 0.5, dbscan_engine : str = 'sklearn', quantile_engine : str = 'exact') -> None:
+        if window < 1 :
+            raise ValueError("La fenêtre doit contenir au moins une séance.")
+        self.window = window
+        self.params = {'nb_outlier' : nb_outlier, 'neighb_DBSCAN' : neighb_DBSCAN, 'eps_DBSCAN' : eps_DBSCAN, 'dbscan_engine' : dbscan_engine, 'dv' : dv, 'n_max' : n_max, 'quantile_engine' : quantile_engine}
+
+        # Résumés des dates de la fenêtre : (date, {joueur : {colonne : tableau}})
+        self.blocks = deque()
+        # Empreinte des points à haute intensité et profil courant de chaque joueur
+        self.high_intensity = {}
+        self.profiles = {}
+
+    def summarise(self, points : pd.DataFrame) -> dict:
+        """Résumé d'une date : candidats de chaque joueur, dans l'ordre (Player, Timestamp). Vide si la date est supprimée."""
+        points = points[points.Acceleration >= 0].sort_values(by = ['Player', 'Timestamp'], kind = 'stable')
+        if points.empty :
+            return {}
+
+        # Règle de mauvaise utilisation (cf Outliers.misuse_error_identification) : toute la date est supprimée
+        misuse = points.Acceleration >= 10.93 - 10.93/10.5 * points.Speed
+        if misuse.groupby(points.Player).sum().max() >= self.params['nb_outlier'] :
+            return {}
+
+        # Zone du DBSCAN entière, ailleurs les plus grandes accélérations par interval dv
+        keep = (points.Acceleration >= 5 - points.Speed).to_numpy()
+        others = points[~keep]
+        rank = others.groupby([others.Player, others.Speed // self.params['dv']]).Acceleration.rank(method = 'dense', ascending = False)
+        keep[~keep] = (rank <= self.params['n_max']).to_numpy()
+        candidates = points[keep]
+
+        return {player : {'Speed' : group.Speed.to_numpy(dtype = float), 'Acceleration' : group.Acceleration.to_numpy(dtype = float)}
+                for player, group in candidates.groupby('Player', sort = False)}
+
+    def add(self, date, points : pd.DataFrame) -> list:
+        """Ajoute une date à la fenêtre (et retire la plus ancienne si la fenêtre est pleine).
+        Retourne la liste des joueurs dont les régressions ont été refaites."""
+        block = self.summarise(points)
+        self.blocks.append((date, block))
+        players = set(block)
+        if len(self.blocks) > self.window :
+            _, evicted = self.blocks.popleft()
+            players |= set(evicted)
+        return [player for player in sorted(players) if self.update(player)]
+
+    def update(self, player : str) -> bool:
+        """Recalcule les erreurs de mesure et les points à haute intensité du joueur sur la fenêtre,
+        puis ses régressions si ces points ont changé."""
+        parts = [block[player] for _, block in self.blocks if player in block]
+        if not parts :
+            self.high_intensity.pop(player, None)
+            self.profiles.pop(player, None)
+            return False
+
+        points = pd.DataFrame({
+            'Player' : player,
+            'Speed' : np.concatenate([part['Speed'] for part in parts]),
+            'Acceleration' : np.concatenate([part['Acceleration'] for part in parts]),
+        })
+        outliers = Outliers(points, nb_outlier = self.params['nb_outlier'], neighb_DBSCAN = self.params['neighb_DBSCAN'], eps_DBSCAN = self.params['eps_DBSCAN'], dbscan_engine = self.params['dbscan_engine'])
+        outliers.measurement_error_identification()
+        if outliers.correct_selection.empty :
+            self.high_intensity.pop(player, None)
+            self.profiles.pop(player, None)
+            return False
+
+        regression = Regression(outliers.correct_selection, dv = self.params['dv'], n_max = self.params['n_max'], quantile_engine = self.params['quantile_engine'])
+        regression.intensity_max_identification()
+
+        # Même ensemble de points à haute intensité : le profil ne change pas
+        high_intensity = regression.high_intensity_points[['Speed', 'Acceleration']].to_numpy(dtype = float)
+        high_intensity = high_intensity[np.lexsort(high_intensity.T[::-1])]
+        key = hashlib.blake2b(high_intensity.tobytes(), digest_size = 16).hexdigest()
+        if self.high_intensity.get(player) == key :
+            return False
+        self.high_intensity[player] = key
+
+        regression.regression_lineaire()
+        regression.regression_quantile()
+        profile = pd.concat([regression.players_linear_regression, regression.compute_quantile_a0_s0()], axis = 1)
+        self.profiles[player] = profile.loc[player].to_dict()
+        return True
+
+    def run(self, points : pd.DataFrame) -> pd.DataFrame:
+        """Série temporelle des profils : pour chaque date et chaque joueur, profil sur la fenêtre se terminant à cette date.
+        Start et n_sessions décrivent la fenêtre, refitted indique si les régressions ont été refaites à cette date."""
+        rows = []
+        for date, day in points.groupby('Date', sort = True) :
+            refitted = self.add(date, day)
+            start = self.blocks[0][0]
+            for player, profile in self.profiles.items() :
+                rows.append({'Player' : player, 'Date' : date, 'Start' : start, 'n_sessions' : len(self.blocks), 'refitted' : player in refitted, **profile})
+        if not rows :
+            return pd.DataFrame()
+        return pd.DataFrame(rows).set_index(['Player', 'Date']).sort_index()
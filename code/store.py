@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from regression import Regression
+from pipeline import profile_player
+
+
+class ProfileStore():
+    """
+    Profils accélération-vitesse d'une saison, mis à jour session par session.
+    Pour chaque joueur, on conserve uniquement les points utiles au calcul :
+        - tous les points de la zone étudiée par le DBSCAN (Acceleration >= 5 - Speed),
+          car une nouvelle session peut changer le statut de bruit des anciens points ;
+        - ailleurs, les n_max plus grandes accélérations par (date, interval dv), ce résumé étant fusionnable.
+    Le nombre de points de mauvaise utilisation par (joueur, date) permet de rejouer la règle sur les dates.
+    La zone du DBSCAN contient tous les points au-dessus de 5 m/s : le stock grandit avec la saison, et chaque intégration
+    relance le DBSCAN sur toute la saison des joueurs concernés. Le moteur 'grid' (par défaut) garde ce coût faible.
+    """
+    def __init__(self, directory : str, dv : float = 0.3, n_max : int = 2, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float = 0.5, dbscan_engine : str = 'grid', quantile_engine : str = 'exact') -> None:
+        self.directory = directory
+        self.params = {'nb_outlier' : nb_outlier, 'neighb_DBSCAN' : neighb_DBSCAN, 'eps_DBSCAN' : eps_DBSCAN, 'dbscan_engine' : dbscan_engine, 'dv' : dv, 'n_max' : n_max, 'quantile_engine' : quantile_engine}
+
+        # Contenu du stock : dates, fichiers déjà intégrés, fichier de chaque joueur et comptage par (joueur, date)
+        self.dates = []
+        self.sources = []
+        self.players = {}
+        self.sessions = pd.DataFrame(columns = ['n_points', 'n_misuse'], index = pd.MultiIndex.from_arrays([[], []], names = ['Player', 'Date']), dtype = int)
+
+        if os.path.isfile(os.path.join(directory, "meta.json")) :
+            self.load()
+        else :
+            os.makedirs(os.path.join(directory, "players"), exist_ok = True)
+
+    def load(self) -> None:
+        """Relit le stock. Les candidats n'étant valables que pour un dv et un n_max donnés, ceux-ci doivent correspondre."""
+        with open(os.path.join(self.directory, "meta.json")) as f :
+            meta = json.load(f)
+        if meta['dv'] != self.params['dv'] or meta['n_max'] != self.params['n_max'] :
+            raise ValueError(f"Le stock {self.directory} a été construit avec dv = {meta['dv']} et n_max = {meta['n_max']}.")
+
+        self.dates = meta['dates']
+        self.sources = meta['sources']
+        self.players = meta['players']
+        sessions = pd.DataFrame(meta['sessions'], columns = ['Player', 'Date', 'n_points', 'n_misuse'])
+        self.sessions = sessions.set_index(['Player', 'Date']).astype(int)
+
+    def dump(self) -> None:
+        """Écrit les métadonnées du stock."""
+        meta = {
+            'dv' : self.params['dv'], 'n_max' : self.params['n_max'],
+            'dates' : self.dates, 'sources' : self.sources, 'players' : self.players,
+            'sessions' : self.sessions.reset_index().values.tolist(),
+        }
+        with open(os.path.join(self.directory, "meta.json.tmp"), 'w') as f :
+            json.dump(meta, f)
+        os.replace(os.path.join(self.directory, "meta.json.tmp"), os.path.join(self.directory, "meta.json"))
+
+    def misuse_dates(self) -> set:
+        """Dates supprimées par la règle de mauvaise utilisation (cf Outliers.misuse_error_identification)."""
+        sessions = self.sessions[self.sessions.n_misuse >= self.params['nb_outlier']]
+        return set(sessions.index.get_level_values('Date'))
+
+    def read_player(self, player : str) -> dict:
+        """Candidats et profil stockés d'un joueur."""
+        if player not in self.players :
+            return {'Timestamp' : np.empty(0, dtype = np.int64), 'Speed' : np.empty(0), 'Acceleration' : np.empty(0), 'Date' : np.empty(0, dtype = np.int32)}
+        with np.load(os.path.join(self.directory, "players", self.players[player])) as data :
+            return {key : data[key] for key in data.files}
+
+    def write_player(self, player : str, data : dict) -> None:
+        """Écrit les candidats et le profil d'un joueur."""
+        if player not in self.players :
+            self.players[player] = hashlib.blake2b(player.encode(), digest_size = 8).hexdigest() + '.npz'
+        np.savez(os.path.join(self.directory, "players", self.players[player]), **data)
+
+    def ingest(self, points : pd.DataFrame, source : str = None) -> list:
+        """Intègre une nouvelle session et recalcule uniquement les profils concernés.
+        `source` (par exemple l'empreinte du fichier) évite d'intégrer deux fois la même session.
+        Retourne la liste des joueurs recalculés."""
+        if source is not None and source in self.sources :
+            return []
+
+        # Mêmes filtres que Outliers : accélérations positives, ligne de mauvaise utilisation et zone du DBSCAN
+        points = points[points.Acceleration >= 0]
+        points = pd.DataFrame({
+            'Player' : points.Player.to_numpy(),
+            'Timestamp' : points.Timestamp.to_numpy(dtype = 'datetime64[ns]').view(np.int64),
+            'Speed' : points.Speed.to_numpy(dtype = float),
+            'Acceleration' : points.Acceleration.to_numpy(dtype = float),
+            'Date' : points.Date.astype(str).to_numpy(),
+        })
+        misuse = points.Acceleration >= 10.93 - 10.93/10.5 * points.Speed
+        sample = points.Acceleration >= 5 - points.Speed
+
+        # Hors zone du DBSCAN : plus grandes accélérations par (joueur, date, interval dv)
+        others = points[~sample]
+        rank = others.groupby([others.Player, others.Date, others.Speed // self.params['dv']]).Acceleration.rank(method = 'dense', ascending = False)
+        candidates = pd.concat([points[sample], others[rank <= self.params['n_max']]]).sort_index()
+
+        # Mise à jour des comptages par (joueur, date)
+        misuse_before = self.misuse_dates()
+        sessions = pd.DataFrame({'Player' : points.Player, 'Date' : points.Date, 'n_points' : 1, 'n_misuse' : misuse.astype(int)}).groupby(['Player', 'Date']).sum()
+        self.sessions = pd.concat([self.sessions, sessions]).groupby(level = ['Player', 'Date']).sum()
+        changed_dates = misuse_before ^ self.misuse_dates()
+
+        # Ajout des candidats joueur par joueur
+        for date in points.Date.unique() :
+            if date not in self.dates :
+                self.dates.append(date)
+        date_codes = {date : code for code, date in enumerate(self.dates)}
+        for player, player_candidates in candidates.groupby('Player') :
+            data = self.read_player(player)
+            self.write_player(player, {
+                'Timestamp' : np.concatenate([data['Timestamp'], player_candidates.Timestamp.to_numpy()]),
+                'Speed' : np.concatenate([data['Speed'], player_candidates.Speed.to_numpy()]),
+                'Acceleration' : np.concatenate([data['Acceleration'], player_candidates.Acceleration.to_numpy()]),
+                'Date' : np.concatenate([data['Date'], player_candidates.Date.map(date_codes).to_numpy(dtype = np.int32)]),
+            })
+        if source is not None :
+            self.sources.append(source)
+
+        # Joueurs concernés : nouvelles données ou date dont le statut de mauvaise utilisation a changé
+        players = set(points.Player.unique())
+        players |= set(self.sessions[self.sessions.index.get_level_values('Date').isin(changed_dates)].index.get_level_values('Player'))
+        players = sorted(player for player in players if player in self.players)
+        self.refit(players)
+        self.dump()
+        return players
+
+    def refit(self, players : list) -> None:
+        """Recalcule le profil des joueurs à partir de leurs candidats, sur les dates non supprimées."""
+        dates = np.array(self.dates, dtype = object)
+        misuse_dates = self.misuse_dates()
+        misuse_codes = [code for code, date in enumerate(self.dates) if date in misuse_dates]
+        plots = {'outliers' : False, 'linear_regression' : False, 'quantile_regression' : False}
+
+        for player in players :
+            data = self.read_player(player)
+            keep = ~np.isin(data['Date'], misuse_codes)
+            # Même ordre que la session complète triée par (Player, Timestamp)
+            order = np.flatnonzero(keep)[np.argsort(data['Timestamp'][keep], kind = 'stable')]
+            shard = {
+                'Player' : player,
+                'index' : np.arange(len(order)),
+                'Speed' : data['Speed'][order],
+                'Acceleration' : data['Acceleration'][order],
+                'Date' : data['Date'][order],
+                'misuse_Speed' : np.empty(0),
+                'misuse_Acceleration' : np.empty(0),
+            }
+            result = profile_player(shard, dates, '', self.params, plots) if len(order) else None
+
+            profile = {key : data[key] for key in ['Timestamp', 'Speed', 'Acceleration', 'Date']}
+            if result is not None :
+                linear, quantile, _, _ = result
+                profile['linear'] = linear.iloc[0].to_numpy(dtype = float)
+                profile['quantile'] = quantile[['q', 'a0', 's0']].to_numpy(dtype = float)
+            self.write_player(player, profile)
+
+    def regression(self) -> Regression:
+        """Régressions de tous les joueurs du stock, dans le format de Regression."""
+        players = sorted(self.players)
+        regression = Regression(pd.DataFrame({'Player' : players}), dv = self.params['dv'], n_max = self.params['n_max'], quantile_engine = self.params['quantile_engine'])
+
+        linear, quantile = {}, {}
+        for player in players :
+            data = self.read_player(player)
+            if 'linear' in data :
+                linear[player] = data['linear']
+                quantile[player] = pd.DataFrame(data['quantile'], columns = ['q', 'a0', 's0'])
+        if linear :
+            regression.players_linear_regression = pd.DataFrame.from_dict(linear, orient = 'index', columns = ['a0 : Regression linéaire', 's0 : Regression linéaire']).rename_axis('Player')
+            regression.players_quantile_regression = pd.concat(quantile, names = ['Player', None])
+        return regression
+
+    def save(self, file_name : str) -> None:
+        """Écrit les profils de la saison dans ./results/ProfilAV_insitu_{file_name}.csv"""
+        self.regression().save(file_name)
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+import math
+import time
+import hashlib
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from regression import Regression
+
+
+def high_intensity_mask(speed : np.ndarray, acceleration : np.ndarray, dv : float, n_max : int) -> np.ndarray:
+    """Points à haute intensité (cf Regression.intensity_max_identification) : rang dense des accélérations
+    par interval dv <= n_max, puis vitesses supérieures à celle du point d'accélération maximale."""
+    if len(speed) == 0 :
+        return np.zeros(0, dtype = bool)
+    bins = speed // dv
+    order = np.lexsort((-acceleration, bins))
+    new_bin = np.r_[True, bins[order][1:] != bins[order][:-1]]
+    new_value = new_bin | np.r_[True, acceleration[order][1:] != acceleration[order][:-1]]
+    distinct = np.cumsum(new_value)
+    rank = np.empty(len(speed), dtype = np.int64)
+    rank[order] = distinct - distinct[np.flatnonzero(new_bin)][np.cumsum(new_bin) - 1] + 1
+
+    keep = rank <= n_max
+    max_acceleration = acceleration[keep].max()
+    return keep & (speed >= speed[keep & (acceleration == max_acceleration)].max())
+
+
+class IncrementalDBSCAN():
+    """
+    Bruit d'un DBSCAN (mêmes règles que sklearn et dbscan.dbscan_noise) tenu à jour à chaque nouveau point.
+    Un point coeur le reste quand des points s'ajoutent : seuls les points non coeur gardent leur nombre de voisins,
+    et seuls les points du bruit proches d'un nouveau point coeur sont réévalués. Un retrait (rare) reconstruit la grille.
+    """
+    # Cellule du point d'abord : les recherches s'arrêtent souvent au premier voisin trouvé
+    OFFSETS = [(0, 0)] + [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+    def __init__(self, eps : float = 0.5, min_samples : int = 3) -> None:
+        self.eps = eps
+        self.min_samples = min_samples
+        # Tous les points : {cellule : [(x, y, id), ...]} ; points non coeur : {cellule : {id : (x, y)}}
+        self.cells = {}
+        self.border_cells = {}
+        # Nombre de voisins (point compris) des points non coeur, statut de bruit de tous les points
+        self.counts = {}
+        self.noise = {}
+        self.coordinates = {}
+
+    def cell(self, x : float, y : float) -> tuple:
+        return math.floor(x / self.eps), math.floor(y / self.eps)
+
+    def neighbours(self, x : float, y : float):
+        """Points à moins de eps de (x, y)."""
+        cx, cy = self.cell(x, y)
+        eps2 = self.eps**2
+        for dx, dy in self.OFFSETS :
+            for ox, oy, other in self.cells.get((cx + dx, cy + dy), ()) :
+                if (x - ox)**2 + (y - oy)**2 <= eps2 :
+                    yield other
+
+    def border_neighbours(self, x : float, y : float) -> list:
+        """Points non coeur à moins de eps de (x, y)."""
+        cx, cy = self.cell(x, y)
+        eps2 = self.eps**2
+        found = []
+        for dx, dy in self.OFFSETS :
+            for other, (ox, oy) in self.border_cells.get((cx + dx, cy + dy), {}).items() :
+                if (x - ox)**2 + (y - oy)**2 <= eps2 :
+                    found.append(other)
+        return found
+
+    def add(self, point, x : float, y : float) -> set:
+        """Ajoute un point ; retourne les points (dont lui-même) dont le statut de bruit a changé."""
+        count = 1
+        for _ in self.neighbours(x, y) :
+            count += 1
+            if count >= self.min_samples :
+                break
+        core = count >= self.min_samples
+
+        # Voisins non coeur : un voisin de plus, certains deviennent coeur
+        new_cores = [point] if core else []
+        for other in self.border_neighbours(x, y) :
+            self.counts[other] += 1
+            if self.counts[other] >= self.min_samples :
+                del self.counts[other], self.border_cells[self.cell(*self.coordinates[other])][other]
+                new_cores.append(other)
+
+        self.coordinates[point] = (x, y)
+        self.cells.setdefault(self.cell(x, y), []).append((x, y, point))
+        if not core :
+            self.counts[point] = count
+            self.border_cells.setdefault(self.cell(x, y), {})[point] = (x, y)
+        self.noise[point] = not core and not any(other not in self.counts for other in self.neighbours(x, y))
+
+        # Points du bruit proches d'un nouveau point coeur (dont les nouveaux points coeur eux-mêmes)
+        changed = {point}
+        for center in new_cores :
+            for other in self.border_neighbours(*self.coordinates[center]) + [center] :
+                if self.noise[other] and other != point :
+                    self.noise[other] = False
+                    changed.add(other)
+        return changed
+
+    def remove(self, points : list) -> set:
+        """Retire des points et reconstruit la grille ; retourne les points restants dont le statut de bruit a changé."""
+        removed = set(points)
+        noise = {point : value for point, value in self.noise.items() if point not in removed}
+        remaining = [(point, self.coordinates[point]) for point in noise]
+        self.__init__(self.eps, self.min_samples)
+        for point, (x, y) in remaining :
+            self.add(point, x, y)
+        return {point for point, value in noise.items() if self.noise[point] != value}
+
+
+def top_values(entries : list, n_max : int) -> list:
+    """Entrées (accélération, ...) dont l'accélération est parmi les n_max plus grandes valeurs distinctes."""
+    values = sorted({entry[0] for entry in entries}, reverse = True)
+    if len(values) <= n_max :
+        return entries
+    return [entry for entry in entries if entry[0] >= values[n_max - 1]]
+
+
+class PlayerStream():
+    """État d'un joueur : dérivée en ligne, points de la zone du DBSCAN et candidats par (date, interval dv)."""
+    def __init__(self, eps : float, min_samples : int) -> None:
+        # Dernier échantillon : horodatage (ns), vitesse ; accélération lissée
+        self.last = None
+        self.smoothed = None
+        self.seq = 0
+
+        # Zone du DBSCAN : {id : (date, interval)} et {(date, interval) : {id : (accélération, seq, vitesse)}}
+        self.dbscan = IncrementalDBSCAN(eps, min_samples)
+        self.zone_keys = {}
+        self.zone = {}
+        # Hors zone : {(date, interval) : [(accélération, seq, vitesse), ...]} limité aux n_max plus grandes valeurs distinctes
+        self.others = {}
+        # Candidats (zone hors bruit et hors zone) par (date, interval), à recalculer pour les clés modifiées
+        self.candidates = {}
+        self.dirty_keys = set()
+
+        # Empreinte des points à haute intensité et profil courant
+        self.key = None
+        self.profile = None
+
+
+class StreamingProfiler():
+    """
+    Profil accélération-vitesse mis à jour au fil d'un flux GPS (échantillons un à un ou par petits lots).
+    À tout instant, le profil est celui que donnerait le calcul hors ligne (main.py) sur les données déjà reçues :
+        - accélération dérivée en ligne par joueur, sans franchir les interruptions de plus de `max_gap` secondes ;
+        - règle de mauvaise utilisation comptée par (joueur, date) : une date signalée est retirée pour tous les joueurs ;
+        - DBSCAN incrémental sur les points de la zone Acceleration >= 5 - Speed ;
+        - seules les n_max plus grandes accélérations par (date, interval dv) peuvent être à haute intensité ;
+        - les régressions d'un joueur ne sont refaites que si ses points à haute intensité changent.
+    """
+    def __init__(self, dv : float = 0.3, n_max : int = 2, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float = 0.5, quantile_engine : str = 'exact',
+                 max_gap : float = 1.0, smoothing : str = None, alpha : float = 0.5, keep_acceleration : bool = False) -> None:
+        if smoothing not in [None, 'exponential'] :
+            raise ValueError(f"Filtre de lissage inconnu en ligne : {smoothing}")
+        self.dv = dv
+        self.n_max = n_max
+        self.nb_outlier = nb_outlier
+        self.neighb_DBSCAN = neighb_DBSCAN
+        self.eps_DBSCAN = eps_DBSCAN
+        self.quantile_engine = quantile_engine
+        self.max_gap = max_gap
+        self.smoothing = smoothing
+        self.alpha = alpha
+        self.keep_acceleration = keep_acceleration
+
+        self.players = {}
+        # Points au-dessus de la droite de mauvaise utilisation par (joueur, date), dates supprimées
+        self.misuse_counts = {}
+        self.misuse_dates = set()
+        self.refits = 0
+
+    def derive(self, player : PlayerStream, timestamp : int, speed : float) -> float:
+        """Accélération du nouvel échantillon (NaN au début d'un segment), cf derivation.derive_acceleration."""
+        last, player.last = player.last, (timestamp, speed)
+        if last is None or timestamp - last[0] <= 0 or timestamp - last[0] > self.max_gap * 1e9 :
+            player.smoothed = None
+            return np.nan
+        acceleration = (speed - last[1]) / ((timestamp - last[0]) * 1e-9)
+        if self.smoothing == 'exponential' :
+            acceleration = acceleration if player.smoothed is None else self.alpha * acceleration + (1 - self.alpha) * player.smoothed
+            player.smoothed = acceleration
+        return acceleration
+
+    def add_point(self, player : PlayerStream, date, speed : float, acceleration : float) -> bool:
+        """Intègre un point nettoyé ; retourne True si les candidats du joueur ont pu changer."""
+        seq = player.seq
+        player.seq += 1
+        key = (date, speed // self.dv)
+
+        if acceleration >= 5 - speed :
+            player.zone_keys[seq] = key
+            player.zone.setdefault(key, {})[seq] = (acceleration, seq, speed)
+            changed = player.dbscan.add(seq, speed, acceleration)
+            # Un nouveau point du bruit ne change rien
+            if changed == {seq} and player.dbscan.noise[seq] :
+                return False
+            player.dirty_keys.update(player.zone_keys[point] for point in changed)
+            return True
+
+        entries = player.others.setdefault(key, [])
+        if len(entries) >= self.n_max and acceleration < min(top_values(entries, self.n_max))[0] :
+            return False
+        entries.append((acceleration, seq, speed))
+        entries[:] = top_values(entries, self.n_max)
+        player.dirty_keys.add(key)
+        return True
+
+    def remove_date(self, date) -> set:
+        """Date signalée par la règle de mauvaise utilisation : ses points sont retirés pour tous les joueurs."""
+        self.misuse_dates.add(date)
+        affected = set()
+        for name, player in self.players.items() :
+            zone = [point for point, key in player.zone_keys.items() if key[0] == date]
+            if zone :
+                changed = player.dbscan.remove(zone)
+                for point in zone :
+                    del player.zone_keys[point]
+                player.dirty_keys.update(player.zone_keys[point] for point in changed)
+            keys = {key for key in list(player.zone) + list(player.others) if key[0] == date}
+            for key in keys :
+                player.zone.pop(key, None), player.others.pop(key, None), player.candidates.pop(key, None)
+            player.dirty_keys -= keys
+            if zone or keys :
+                affected.add(name)
+        return affected
+
+    def update(self, records) -> list:
+        """Intègre un échantillon (dict) ou un lot d'échantillons (DataFrame ou liste de dicts) avec les champs
+        Player, Timestamp, Speed (m/s) et éventuellement Acceleration et Date. Les échantillons d'un joueur arrivent dans l'ordre.
+        Retourne la liste des joueurs dont le profil a été recalculé."""
+        if isinstance(records, dict) :
+            records = [records]
+        elif isinstance(records, pd.DataFrame) :
+            records = records.to_dict('records')
+
+        dirty = set()
+        for record in records :
+            name = record['Player']
+            if name not in self.players :
+                self.players[name] = PlayerStream(self.eps_DBSCAN, self.neighb_DBSCAN)
+            player = self.players[name]
+
+            timestamp = pd.Timestamp(record['Timestamp'])
+            date = record['Date'] if 'Date' in record else timestamp.date()
+            speed = float(record['Speed'])
+            acceleration = self.derive(player, timestamp.value, speed)
+            if self.keep_acceleration and 'Acceleration' in record :
+                acceleration = float(record['Acceleration'])
+
+            # Accélérations négatives ou indéfinies : inutiles ici (cf Outliers)
+            if not acceleration >= 0 or date in self.misuse_dates :
+                continue
+
+            # Règle de mauvaise utilisation
+            if acceleration >= 10.93 - 10.93/10.5 * speed :
+                count = self.misuse_counts.get((name, date), 0) + 1
+                self.misuse_counts[(name, date)] = count
+                if count >= self.nb_outlier :
+                    dirty |= self.remove_date(date)
+                    continue
+
+            if self.add_point(player, date, speed, acceleration) :
+                dirty.add(name)
+
+        return [name for name in sorted(dirty) if self.refit(name)]
+
+    def refit(self, name : str) -> bool:
+        """Recalcule les points à haute intensité du joueur, puis ses régressions s'ils ont changé."""
+        player = self.players[name]
+        for key in player.dirty_keys :
+            entries = [entry for seq, entry in player.zone.get(key, {}).items() if not player.dbscan.noise[seq]] + player.others.get(key, [])
+            player.candidates[key] = top_values(entries, self.n_max)
+        player.dirty_keys.clear()
+
+        points = [entry for entries in player.candidates.values() for entry in entries]
+        if not points :
+            changed = player.key is not None
+            player.key, player.profile = None, None
+            return changed
+
+        # Ordre d'arrivée, comme les données triées par horodatage
+        points = np.array(points)
+        points = points[np.argsort(points[:, 1], kind = 'stable')]
+        acceleration, speed = points[:, 0], points[:, 2]
+        keep = high_intensity_mask(speed, acceleration, self.dv, self.n_max)
+        speed, acceleration = speed[keep], acceleration[keep]
+
+        key = hashlib.blake2b(np.column_stack([speed, acceleration]).tobytes(), digest_size = 16).hexdigest()
+        if key == player.key :
+            return False
+        player.key = key
+
+        high_intensity_points = pd.DataFrame({'Player' : name, 'Speed' : speed, 'Acceleration' : acceleration})
+        # Profils partiels souvent de mauvaise qualité en début de flux : a0 et s0 linéaires restent alors indéfinis, sans avertissement à chaque mise à jour
+        with warnings.catch_warnings() :
+            warnings.simplefilter('ignore')
+            regression = Regression(high_intensity_points, dv = self.dv, n_max = self.n_max, quantile_engine = self.quantile_engine)
+            regression.high_intensity_points = high_intensity_points
+            regression.regression_lineaire()
+            regression.regression_quantile()
+            player.profile = pd.concat([regression.players_linear_regression, regression.compute_quantile_a0_s0()], axis = 1).loc[name]
+        self.refits += 1
+        return True
+
+    def profiles(self) -> pd.DataFrame:
+        """Profils courants, dans le format des résultats de main.py."""
+        profiles = {name : player.profile for name, player in sorted(self.players.items()) if player.profile is not None}
+        if not profiles :
+            return pd.DataFrame()
+        return pd.DataFrame.from_dict(profiles, orient = 'index').rename_axis('Player')
+
+
+def replay(points : pd.DataFrame, profiler : StreamingProfiler, speed : float = 1.0, batch_interval : float = 1.0) -> dict:
+    """Rejoue une session comme un flux : les échantillons, triés par horodatage, sont envoyés par lots de `batch_interval` secondes,
+    `speed` fois plus vite que le temps réel (0 : aussi vite que possible).
+    Retourne la latence de mise à jour de chaque lot (fin du traitement - arrivée du dernier échantillon) et le débit soutenu."""
+    columns = [column for column in ['Player', 'Timestamp', 'Speed', 'Acceleration', 'Date'] if column in points.columns]
+    points = points[columns].sort_values(by = 'Timestamp', kind = 'stable')
+    timestamps = pd.DatetimeIndex(points.Timestamp).asi8
+    if len(points) == 0 :
+        return {}
+    batches = (timestamps - timestamps[0]) // int(batch_interval * 1e9)
+    bounds = np.flatnonzero(np.r_[True, batches[1:] != batches[:-1], True])
+    records = points.to_dict('records')
+
+    latencies, busy = [], 0.0
+    start = time.perf_counter()
+    for first, stop in zip(bounds[:-1], bounds[1:]) :
+        # Arrivée du dernier échantillon du lot
+        arrival = start + (timestamps[stop - 1] - timestamps[0]) * 1e-9 / speed if speed > 0 else time.perf_counter()
+        if speed > 0 :
+            time.sleep(max(0.0, arrival - time.perf_counter()))
+        begin = time.perf_counter()
+        profiler.update(records[first:stop])
+        end = time.perf_counter()
+        busy += end - begin
+        latencies.append(end - arrival)
+
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies)
+    return {
+        'records' : len(records), 'batches' : len(latencies), 'refits' : profiler.refits,
+        'speed' : speed, 'batch_interval' : batch_interval,
+        'stream_duration' : (timestamps[-1] - timestamps[0]) * 1e-9, 'elapsed' : elapsed, 'busy' : busy,
+        'throughput' : len(records) / busy if busy else np.inf,
+        'latency_p50' : float(np.percentile(latencies, 50)), 'latency_p95' : float(np.percentile(latencies, 95)), 'latency_max' : float(latencies.max()),
+    }
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import itertools
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from outliers import Outliers
+from regression import Regression
+from columns import PointSelection
+
+# Valeurs par défaut des paramètres (cf main.py)
+DEFAULTS = {'nb_outlier' : 10, 'neighb_DBSCAN' : 3, 'eps_DBSCAN' : 0.5, 'dbscan_engine' : 'sklearn', 'dv' : 0.3, 'n_max' : 2, 'quantile_engine' : 'exact'}
+
+# Graphe des étapes : chaque étape dépend de la précédente et n'est mémorisée que sur les paramètres qu'elle utilise
+PARAMETERS = {
+    'misuse' : ['nb_outlier'],
+    'measurement' : ['nb_outlier', 'neighb_DBSCAN', 'eps_DBSCAN', 'dbscan_engine'],
+    'ranking' : ['nb_outlier', 'neighb_DBSCAN', 'eps_DBSCAN', 'dbscan_engine', 'dv'],
+    'intensity' : ['nb_outlier', 'neighb_DBSCAN', 'eps_DBSCAN', 'dbscan_engine', 'dv', 'n_max'],
+}
+
+
+def expand_grid(grid : dict) -> list:
+    """Toutes les combinaisons d'une grille {paramètre : liste de valeurs, ou valeur seule}, les autres paramètres gardant leur valeur par défaut."""
+    unknown = set(grid) - set(DEFAULTS)
+    if unknown :
+        raise ValueError(f"Paramètres inconnus : {', '.join(sorted(unknown))}")
+    values = {name : [default] for name, default in DEFAULTS.items()}
+    for name, value in grid.items() :
+        values[name] = list(value) if isinstance(value, (list, tuple)) else [value]
+        if not values[name] :
+            raise ValueError(f"Aucune valeur pour le paramètre {name}")
+    return [dict(zip(values, combination)) for combination in itertools.product(*values.values())]
+
+
+class Sweep():
+    """
+    Évaluation d'une grille de paramètres sur une même session.
+    Chaque étape (mauvaise utilisation, erreurs de mesure, rangs par interval dv, points à haute intensité)
+    est calculée une seule fois par valeur des paramètres dont elle dépend, sur des sélections de lignes d'une même table. Les rangs ne dépendent pas de n_max :
+    un seul classement par dv sert à toutes les valeurs de n_max. Les régressions d'un joueur sont mémorisées
+    sur ses points à haute intensité, identiques pour de nombreuses combinaisons.
+    """
+    def __init__(self, points : pd.DataFrame) -> None:
+        # Colonnes partagées par toutes les combinaisons : chaque étape ne mémorise qu'une sélection de lignes
+        self.points = PointSelection.of(points)
+        self.cache = {stage : {} for stage in PARAMETERS}
+        self.fits = {}
+        # Nombre de calculs effectifs par étape
+        self.computed = Counter()
+
+    def memo(self, stage : str, params : dict, compute):
+        key = tuple(params[name] for name in PARAMETERS[stage])
+        if key not in self.cache[stage] :
+            self.cache[stage][key] = compute()
+            self.computed[stage] += 1
+        return self.cache[stage][key]
+
+    def misuse(self, params : dict) -> PointSelection:
+        """Points restants après la règle de mauvaise utilisation."""
+        def compute() :
+            outliers = Outliers(self.points, nb_outlier = params['nb_outlier'])
+            outliers.misuse_error_identification()
+            return outliers.correct_selection
+        return self.memo('misuse', params, compute)
+
+    def measurement(self, params : dict) -> PointSelection:
+        """Points restants après le DBSCAN."""
+        def compute() :
+            outliers = Outliers(self.misuse(params), nb_outlier = params['nb_outlier'], neighb_DBSCAN = params['neighb_DBSCAN'], eps_DBSCAN = params['eps_DBSCAN'], dbscan_engine = params['dbscan_engine'])
+            outliers.measurement_error_identification()
+            return outliers.correct_selection
+        return self.memo('measurement', params, compute)
+
+    def ranking(self, params : dict) -> np.ndarray:
+        """Rang des accélérations des points nettoyés par joueur et interval dv."""
+        def compute() :
+            return Regression(self.measurement(params), dv = params['dv']).rank_acceleration()
+        return self.memo('ranking', params, compute)
+
+    def intensity(self, params : dict) -> pd.DataFrame:
+        """Points à haute intensité."""
+        def compute() :
+            regression = Regression(self.measurement(params), dv = params['dv'], n_max = params['n_max'])
+            regression.rank = self.ranking(params)
+            return regression.select_high_intensity()
+        return self.memo('intensity', params, compute)
+
+    def profiles(self, params : dict) -> pd.DataFrame:
+        """Profil de chaque joueur ; seuls les joueurs dont les points à haute intensité sont nouveaux sont ajustés."""
+        high_intensity_points = self.intensity(params)
+        keys = {}
+        for player, group in high_intensity_points.groupby('Player') :
+            digest = hashlib.blake2b(group[['Speed', 'Acceleration']].to_numpy(dtype = float).tobytes(), digest_size = 16).hexdigest()
+            keys[player] = (player, params['quantile_engine'], digest)
+
+        missing = [player for player, key in keys.items() if key not in self.fits]
+        if missing :
+            points = high_intensity_points[high_intensity_points.Player.isin(missing)]
+            regression = Regression(points, dv = params['dv'], n_max = params['n_max'], quantile_engine = params['quantile_engine'])
+            regression.high_intensity_points = points
+            regression.regression_lineaire()
+            regression.regression_quantile()
+            profiles = pd.concat([regression.players_linear_regression, regression.compute_quantile_a0_s0()], axis = 1)
+            for player in missing :
+                self.fits[keys[player]] = {'n_high_intensity' : int((points.Player == player).sum()), **profiles.loc[player].to_dict()}
+            self.computed['regression'] += len(missing)
+
+        return pd.DataFrame.from_dict({player : self.fits[key] for player, key in keys.items()}, orient = 'index').rename_axis('Player')
+
+    def evaluate(self, combinations : list) -> pd.DataFrame:
+        """Table des profils : une ligne par (combinaison, joueur)."""
+        tables = []
+        for k, params in combinations :
+            profiles = self.profiles(params).reset_index()
+            tables.append(pd.concat([pd.DataFrame({'combination' : k, **params}, index = profiles.index), profiles], axis = 1))
+        return pd.concat(tables, ignore_index = True) if tables else pd.DataFrame()
+
+
+# Une session et ses résultats intermédiaires par processus
+_sweep = None
+
+def init_worker(points : pd.DataFrame) -> None:
+    global _sweep
+    _sweep = Sweep(points)
+
+def evaluate_group(combinations : list) -> pd.DataFrame:
+    return _sweep.evaluate(combinations)
+
+
+def sweep(points : pd.DataFrame, grid : dict, workers : int = 1) -> pd.DataFrame:
+    """Profils accélération-vitesse pour toutes les combinaisons de `grid`, sur `workers` processus.
+    Les combinaisons partageant le même nettoyage sont évaluées ensemble, pour profiter des résultats intermédiaires."""
+    combinations = list(enumerate(expand_grid(grid)))
+
+    if workers > 1 :
+        groups = {}
+        for k, params in combinations :
+            groups.setdefault(tuple(params[name] for name in PARAMETERS['measurement']), []).append((k, params))
+        with ProcessPoolExecutor(max_workers = workers, initializer = init_worker, initargs = (points,)) as executor :
+            tables = list(executor.map(evaluate_group, groups.values()))
+    else :
+        tables = [Sweep(points).evaluate(combinations)]
+
+    tables = [table for table in tables if not table.empty]
+    if not tables :
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index = True).sort_values(by = ['combination', 'Player'], kind = 'stable', ignore_index = True)
@@ -9,9 +9,6 @@ import sys
 import os
 sys.path.insert(0, os.getcwd() + '/code')
 
-from code.outliers import Outliers
-from code.regression import Regression
-import pandas as pd
 import argparse
 
 
@@ -31,21 +28,52 @@ if __name__ == "__main__":
     
     parser.add_argument('-s','--convert_speed', action="store_true", help="Apply speed conversion from km/h to m/s.")
     parser.add_argument('-k','--keep_acceleration', action="store_true", help="Use acceleration in csv file")
+    parser.add_argument('--smoothing', type=str, choices=['savgol', 'exponential'], help="Filter applied to the computed acceleration.")
+    parser.add_argument('--max_gap', type=float, help="Longest gap (s) the acceleration is derived across (default: 3 sampling intervals, at least 1 s).")
+    parser.add_argument('--no_cache', action="store_true", help="Do not use the cache of parsed session files")
+    parser.add_argument('--batch', type=str, help="Directory or glob of csv files profiled together in one run.")
+    parser.add_argument('--io_workers', type=int, help="Numbers of threads reading the files of a batch.")
     
     parser.add_argument("--dv", type =float, help="Small speed range in max intensity identification.")
     parser.add_argument("--n_max", type =int, help="Numbers of points by small speed range in max intensity identification.")
+    parser.add_argument("--dbscan_engine", type =str, choices=['sklearn', 'grid'], help="DBSCAN used to identify measurement errors (default: sklearn, grid with --store).")
+    parser.add_argument("--group_by", type =str, nargs='+', help="Columns defining the profiled groups, e.g. Player Drill (Player by default).")
+    parser.add_argument("--store", type =str, help="Season profile store folder in which the session is added.")
+    parser.add_argument("--rolling", type =int, help="Profiles on a rolling window of this numbers of sessions (dates), advanced one session at a time.")
+    parser.add_argument("--sweep", type =str, help="JSON file of parameter values to sweep, e.g. {\"dv\": [0.2, 0.3], \"n_max\": [1, 2, 3]}.")
+    parser.add_argument("--replay", action="store_true", help="Replay the session as a live feed through the streaming profiler.")
+    parser.add_argument("--replay_speed", type =float, help="Replay speed, as a multiple of real time (0: as fast as possible).")
+    parser.add_argument("--bootstrap", type =int, help="Numbers of bootstrap resamples used for the confidence intervals of a0 and s0.")
+    parser.add_argument("--seed", type =int, help="Seed of the bootstrap resamples.")
+    parser.add_argument("--workers", type =int, help="Numbers of processes used to profile players in parallel.")
+    parser.add_argument("--report", action="store_true", help="Write a JSON report of the run (timings, rows, memory, fit diagnostics) next to the csv results.")
+    parser.add_argument("--profile", action="store_true", help="Profile the run with cProfile.")
 
     args = parser.parse_args()
     filename, convert_speed, keep_acceleration = args.filename, args.convert_speed, args.keep_acceleration
+    no_cache, smoothing, max_gap = args.no_cache, args.smoothing, args.max_gap
+    batch, io_workers = args.batch, args.io_workers
     dv, n_max = args.dv, args.n_max
+    workers, store, rolling, sweep = args.workers, args.store, args.rolling, args.sweep
+    dbscan_engine, group_by = args.dbscan_engine, args.group_by
+    report, profile = args.report, args.profile
+    n_resamples, seed = args.bootstrap, args.seed
+    replay, replay_speed = args.replay, args.replay_speed
 
 
     # ---------------------- Default Arguments ---------------------------- #
 
     sep = ','
+    # En mode batch, les résultats portent le nom du dossier
+    if batch and not filename :
+        filename = os.path.basename(os.path.normpath(batch)) if os.path.isdir(batch) else 'batch'
     filename = filename if filename else 'Session_example'
     convert_speed = convert_speed if convert_speed else False 
     keep_acceleration = keep_acceleration if keep_acceleration else False
+    smoothing = smoothing if smoothing else None
+    max_gap = max_gap if max_gap else None
+    cache_dir = 'data/.cache'
+    io_workers = io_workers if io_workers else 4
 
     display = False
     save_plot_outliers = True
@@ -54,37 +82,45 @@ if __name__ == "__main__":
 
     dv = dv if dv else 0.3
     n_max = n_max if n_max else 2
+    workers = workers if workers else 1
+    # Le stock relance le DBSCAN sur la saison de chaque joueur concerné : moteur grille par défaut (mêmes erreurs de mesure)
+    dbscan_engine = dbscan_engine if dbscan_engine else ('grid' if store else 'sklearn')
+    group_by = group_by if group_by else ['Player']
+    # Le magasin de profils, la fenêtre glissante, le balayage et le rejeu profilent joueur par joueur
+    if group_by != ['Player'] and (store or rolling or sweep or replay) :
+        parser.error("--group_by is only available for the session and batch profiles (not with --store, --rolling, --sweep or --replay)")
+    # Le rejeu dérive l'accélération en ligne : seul le filtre exponentiel est causal
+    if replay and smoothing == 'savgol' :
+        parser.error("--smoothing savgol is not available with --replay (use --smoothing exponential)")
+    n_resamples = n_resamples if n_resamples else 0
+    seed = seed if seed else 0
+    replay_speed = replay_speed if replay_speed else 0
 
-    # -------------------- File Loading -------------------- #
-
-    df_session = pd.read_csv(f"data/{filename}.csv", parse_dates=['Timestamp'], sep = sep)
-    
-    if not "Acceleration" in df_session.columns :
-        df_session.loc[:, 'Acceleration'] = 0
-    df_session = df_session.dropna(subset=['Acceleration', 'Speed'])
-
-    # Conversion en type numérique
-    try : 
-        df_session.loc[:, 'Speed'] = pd.to_numeric(df_session.Speed) 
-        df_session.loc[:, 'Acceleration'] = pd.to_numeric(df_session.Acceleration)
-    except : 
-        df_session.loc[:, 'Speed'] = pd.to_numeric(df_session.Speed.str.replace(',', '.').astype(float))
-        df_session.loc[:, 'Acceleration'] = pd.to_numeric(df_session.Acceleration.str.replace(',', '.').astype(float))
-
-    # Km/h to m/s ? 
-    if convert_speed :
-        df_session.loc[:, 'Speed'] = df_session.Speed / 3.6
+    # Imports après l'analyse des arguments : --help ou une erreur d'argument ne chargent rien.
+    # Les bibliothèques lourdes (sklearn, statsmodels, matplotlib, scipy) ne sont chargées que par les étapes qui les utilisent.
+    from code.loading import load_session
+    from code.instrumentation import Report
 
-    # La date est nécessaire pour la suite
-    if not 'Date' in df_session.columns :
-        df_session.loc[:, 'Date'] = df_session.Timestamp.dt.date
+    # Instrumentation (aucune mesure si désactivée)
+    report = Report(enabled = report)
+    report_path = f"./results/ProfilAV_insitu_{filename}_report.json"
+    profile_path = f"./results/ProfilAV_insitu_{filename}.prof" if profile else None
+    context = {'filename' : filename, 'convert_speed' : convert_speed, 'keep_acceleration' : keep_acceleration, 'smoothing' : smoothing, 'max_gap' : max_gap,
+               'dv' : dv, 'n_max' : n_max, 'workers' : workers, 'dbscan_engine' : dbscan_engine, 'group_by' : group_by, 'store' : store, 'rolling' : rolling, 'sweep' : sweep, 'batch' : batch, 'n_resamples' : n_resamples, 'seed' : seed,
+               'replay' : replay, 'replay_speed' : replay_speed}
 
-    # Si calcul de l'accélération il est nécessaire d'ordonner le fichier
-    df_session = df_session.sort_values(by = ['Player', 'Timestamp'])
+    # -------------------- File Loading -------------------- #
 
-    # Recalcul de l'accélération ? 
-    if not keep_acceleration :
-        df_session["Acceleration"] = (df_session.Speed - df_session.Speed.shift(1))/((df_session.Timestamp - df_session.Timestamp.shift(1)).dt.total_seconds())
+    with report.stage('load', rows_out = lambda : df_session) :
+        if batch :
+            # Tous les fichiers en une seule table, avec leur provenance (colonne Source)
+            from code.batch import expand_sources, read_sources
+            sources = expand_sources(batch)
+            df_session = read_sources(sources, sep = sep, convert_speed = convert_speed, keep_acceleration = keep_acceleration, smoothing = smoothing, max_gap = max_gap, 
+                                      cache_dir = None if no_cache else cache_dir, io_workers = io_workers)
+        else :
+            df_session = load_session(f"data/{filename}.csv", sep = sep, convert_speed = convert_speed, keep_acceleration = keep_acceleration, smoothing = smoothing, max_gap = max_gap, 
+                                      cache_dir = None if no_cache else cache_dir)
 
 
     # ------------------------------- Tests -------------------------------- #
@@ -92,30 +128,130 @@ if __name__ == "__main__":
     for column in ['Date', 'Speed', 'Acceleration', 'Player', 'Timestamp'] :
         assert column in df_session.columns.tolist(), "Des colonnes essentielles au déroullement du code sont manquantes."
 
+    assert set(group_by) <= set(df_session.columns), f"Les colonnes de regroupement {group_by} sont absentes du fichier."
+
     assert df_session.Speed.quantile(0.99) <= 10, "Les données de vitesse sont probablement en km/h. Merci de les convertir en m/s."
 
     # -------------------- In-Situ Speed-Acceleration Profiling -------------------- #
-    # Outliers
-    outliers = Outliers(df_session)
-    outliers.misuse_error_identification()
-    outliers.measurement_error_identification()
-    if save_plot_outliers :
-        outliers.plot(filename, display = display)
-
-    # Régressions - Étape 1
-    regression = Regression(outliers.correct_points, dv=dv, n_max=n_max)
-    regression.intensity_max_identification()
-
-    # Régression linéaire classique (JB Morin)
-    regression.regression_lineaire()
-    if save_plot_linear_regression :
-        regression.plot_linear(filename, display=display)
-
-    # Régression quantile (N Miguens)
-    regression.regression_quantile()
-    if save_plot_quantile_regression :
-        regression.plot_quantile(filename, display = display)
-
-    # On enregistre les résultats 
-    regression.save(filename)
+    # Ajout de la session aux profils de la saison : seuls les joueurs concernés sont recalculés
+    if store :
+        from code.loading import file_hash
+        from code.store import ProfileStore
+        season = ProfileStore(store, dv=dv, n_max=n_max, dbscan_engine=dbscan_engine)
+        with report.profile(profile_path), report.stage('ingest', rows_in = lambda : df_session) :
+            if batch :
+                # Un fichier après l'autre : chaque fichier n'est intégré qu'une seule fois
+                for source, points in df_session.groupby('Source', observed = True, sort = False) :
+                    season.ingest(points.drop(columns = 'Source'), source = file_hash(source))
+            else :
+                season.ingest(df_session, source = file_hash(f"data/{filename}.csv"))
+        with report.stage('save') :
+            season.save(os.path.basename(os.path.normpath(store)))
+        report.save(report_path, **context)
+        sys.exit()
+
+    # Profils sur une fenêtre glissante de séances : seuls les joueurs dont les points à haute intensité changent sont recalculés
+    if rolling :
+        from code.rolling import RollingProfile
+        with report.profile(profile_path), report.stage('rolling', rows_in = lambda : df_session) :
+            series = RollingProfile(rolling, dv=dv, n_max=n_max, dbscan_engine=dbscan_engine).run(df_session)
+        with report.stage('save') :
+            series.to_csv(f"./results/ProfilAV_insitu_{filename}_rolling.csv")
+        report.save(report_path, **context)
+        sys.exit()
+
+    # Balayage de paramètres : une ligne par (combinaison, joueur), les étapes communes ne sont calculées qu'une fois
+    if sweep :
+        import json
+        from code.sweep import sweep as parameter_sweep
+        with open(sweep) as f :
+            grid = json.load(f)
+        with report.profile(profile_path), report.stage('sweep', rows_in = lambda : df_session) :
+            table = parameter_sweep(df_session, {'dv' : [dv], 'n_max' : [n_max], 'dbscan_engine' : [dbscan_engine], **grid}, workers = workers)
+        with report.stage('save') :
+            table.to_csv(f"./results/ProfilAV_insitu_{filename}_sweep.csv", index = False)
+        report.save(report_path, **context)
+        sys.exit()
+
+    # Rejeu de la session comme un flux GPS : profils mis à jour à chaque lot d'une seconde, latence et débit mesurés
+    if replay :
+        import json
+        import pandas as pd
+        from code.derivation import default_max_gap
+        from code.instrumentation import to_json
+        from code.streaming import StreamingProfiler, replay as replay_session
+        # Même trou maximal que la dérivation hors ligne de la session
+        if max_gap is None :
+            max_gap = default_max_gap(df_session.Player.to_numpy(), pd.DatetimeIndex(df_session.Timestamp).asi8)
+        profiler = StreamingProfiler(dv=dv, n_max=n_max, max_gap=max_gap, smoothing=smoothing, keep_acceleration=keep_acceleration)
+        with report.profile(profile_path), report.stage('replay', rows_in = lambda : df_session) :
+            stats = replay_session(df_session, profiler, speed = replay_speed)
+        print(json.dumps(stats, indent = 1, default = to_json))
+        with report.stage('save') :
+            profiler.profiles().to_csv(f"./results/ProfilAV_insitu_{filename}_stream.csv")
+            with open(f"./results/ProfilAV_insitu_{filename}_replay.json", 'w') as f :
+                json.dump(stats, f, indent = 1, default = to_json)
+        report.save(report_path, **context)
+        sys.exit()
+
+    # Profilage parallèle joueur par joueur (en mode batch ou par groupes, les processus servent aux visuels)
+    if workers > 1 and not batch and group_by == ['Player'] :
+        from code.pipeline import run
+        with report.profile(profile_path), report.stage('profiling', rows_in = lambda : df_session) :
+            regression = run(df_session, filename, workers = workers, 
+                             params = {'dv' : dv, 'n_max' : n_max, 'dbscan_engine' : dbscan_engine, 'n_resamples' : n_resamples, 'seed' : seed}, 
+                             plots = {'outliers' : save_plot_outliers, 'linear_regression' : save_plot_linear_regression, 'quantile_regression' : save_plot_quantile_regression})
+        with report.stage('save') :
+            regression.save(filename)
+        report.fits(regression.diagnostics)
+        report.save(report_path, **context)
+        sys.exit()
+
+    from code.outliers import Outliers
+    from code.regression import Regression
+
+    with report.profile(profile_path) :
+        # Outliers
+        outliers = Outliers(df_session, dbscan_engine=dbscan_engine, group_by=group_by)
+        with report.stage('misuse_error_identification', rows_in = lambda : outliers.correct_selection, rows_out = lambda : outliers.correct_selection) :
+            outliers.misuse_error_identification()
+        with report.stage('measurement_error_identification', rows_in = lambda : outliers.correct_selection, rows_out = lambda : outliers.correct_selection) :
+            outliers.measurement_error_identification()
+        if save_plot_outliers :
+            with report.stage('plot_outliers') :
+                outliers.plot(filename, display = display, workers = workers)
+
+        # Régressions - Étape 1
+        regression = Regression(outliers.correct_selection, dv=dv, n_max=n_max)
+        with report.stage('intensity_max_identification', rows_in = lambda : regression.selection, rows_out = lambda : regression.high_intensity_points) :
+            regression.intensity_max_identification()
+
+        # Régression linéaire classique (JB Morin)
+        with report.stage('regression_lineaire', rows_in = lambda : regression.high_intensity_points) :
+            regression.regression_lineaire()
+        if save_plot_linear_regression :
+            with report.stage('plot_linear_regression') :
+                regression.plot_linear(filename, display=display, workers = workers)
+
+        # Régression quantile (N Miguens)
+        with report.stage('regression_quantile', rows_in = lambda : regression.high_intensity_points) :
+            regression.regression_quantile()
+        if save_plot_quantile_regression :
+            with report.stage('plot_quantile_regression') :
+                regression.plot_quantile(filename, display = display, workers = workers)
+
+        # Intervalles de confiance bootstrap
+        if n_resamples :
+            with report.stage('bootstrap', rows_in = lambda : regression.high_intensity_points) :
+                regression.bootstrap(n_resamples, seed = seed, workers = workers)
+
+        # On enregistre les résultats 
+        with report.stage('save') :
+            regression.save(filename)
+            # Provenance : comptages par joueur, fichier et date
+            if batch :
+                from code.batch import provenance
+                provenance(df_session, outliers, regression).to_csv(f"./results/ProfilAV_insitu_{filename}_sources.csv")
 
+    report.fits(regression.diagnostics)
+    report.save(report_path, **context)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Les modules de code/ s'importent entre eux comme modules de premier niveau (cf main.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'code'))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def high_intensity_points() -> pd.DataFrame:
+    """Points à haute intensité de plusieurs joueurs (profil a0 - s0 et bruit sous la droite),
+    dont des joueurs aux valeurs arrondies à 0.1 (nombreux ex æquo)."""
+    rng = np.random.default_rng(1)
+    frames = []
+    for k, n in enumerate([40, 120]) :
+        a0, s0 = rng.uniform(5, 8), rng.uniform(8, 10)
+        speed = rng.uniform(3, 9, n)
+        acceleration = a0 * (1 - speed / s0) - np.abs(rng.normal(0, .25, n))
+        frames.append(pd.DataFrame({'Player' : f"random_{k}", 'Speed' : speed, 'Acceleration' : acceleration}))
+        frames.append(pd.DataFrame({'Player' : f"rounded_{k}", 'Speed' : speed.round(1), 'Acceleration' : acceleration.round(1)}))
+    return pd.concat(frames, ignore_index = True)
+
+
+@pytest.fixture(scope = 'session')
+def season() -> pd.DataFrame:
+    """Saison synthétique de 3 joueurs sur 4 dates (10 Hz, 5 min par séance), accélération dérivée,
+    avec une salve de mauvaise utilisation le 3e jour de Player_001 (date supprimée pour tous les joueurs)."""
+    from benchmark.generator import generate_season, inject_misuse
+    from derivation import derive_acceleration
+    session, _ = generate_season(3, 4, rate = 10, duration = 300, misuse_rate = 0, seed = 3)
+    rows = np.flatnonzero((session.Player == 'Player_001').to_numpy() & (session.Date == session.Date.unique()[2]).to_numpy())
+    speed = session.Speed.to_numpy()[rows]
+    inject_misuse(np.random.default_rng(0), speed, 10)
+    session.loc[rows, 'Speed'] = speed
+    session['Acceleration'] = derive_acceleration(session.Speed.to_numpy(), pd.DatetimeIndex(session.Timestamp).asi8, session.Player.to_numpy())
+    return session
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Chaîne de référence des tests : profilage série de main.py (Outliers puis Regression), sans visuels.
+"""
+
+import pandas as pd
+
+from outliers import Outliers
+from regression import Regression
+
+
+def reference_regression(points : pd.DataFrame, nb_outlier : int = 10, neighb_DBSCAN : int = 3, eps_DBSCAN : float = 0.5, dbscan_engine : str = 'sklearn', dv : float = 0.3, n_max : int = 2, quantile_engine : str = 'exact') -> Regression:
+    """Régressions de la chaîne série sur `points`."""
+    outliers = Outliers(points, nb_outlier = nb_outlier, neighb_DBSCAN = neighb_DBSCAN, eps_DBSCAN = eps_DBSCAN, dbscan_engine = dbscan_engine)
+    outliers.misuse_error_identification()
+    outliers.measurement_error_identification()
+    regression = Regression(outliers.correct_selection, dv = dv, n_max = n_max, quantile_engine = quantile_engine)
+    regression.intensity_max_identification()
+    regression.regression_lineaire()
+    regression.regression_quantile()
+    return regression
+
+
+def profile_table(regression : Regression) -> pd.DataFrame:
+    """Profils linéaire et quantile, une ligne par joueur (colonnes du csv de résultats)."""
+    return pd.concat([regression.players_linear_regression, regression.compute_quantile_a0_s0()], axis = 1)
+
+
+def reference_profiles(points : pd.DataFrame, **params) -> pd.DataFrame:
+    """Profils de la chaîne série sur `points`."""
+    return profile_table(reference_regression(points, **params))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bootstrap
+from bootstrap import bootstrap_linear, bootstrap_profiles, bootstrap_quantile
+from quantile import QUANTILES, quantile_regression
+from regression import Regression
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+
+def test_depends_only_on_seed(high_intensity_points):
+    serial, _ = bootstrap_profiles(high_intensity_points, 60, seed = 1, block_size = 25)
+    parallel, _ = bootstrap_profiles(high_intensity_points, 60, seed = 1, workers = 3, block_size = 25)
+    pd.testing.assert_frame_equal(parallel, serial, check_exact = True)
+    # Les tirages d'un joueur ne dépendent pas des autres joueurs
+    alone, _ = bootstrap_profiles(high_intensity_points[high_intensity_points.Player == 'random_1'], 60, seed = 1, block_size = 25)
+    pd.testing.assert_frame_equal(alone, serial.loc[['random_1']], check_exact = True)
+    other, _ = bootstrap_profiles(high_intensity_points, 60, seed = 2, block_size = 25)
+    assert not other.equals(serial)
+
+
+def test_unit_weights_reproduce_the_pipeline(high_intensity_points):
+    regression = Regression(high_intensity_points)
+    regression.high_intensity_points = high_intensity_points
+    regression.regression_lineaire()
+    regression.regression_quantile()
+    for player, points in high_intensity_points.groupby('Player') :
+        x, y = points.Speed.to_numpy(), points.Acceleration.to_numpy()
+        weights = np.ones((1, len(x)))
+
+        a0, s0 = bootstrap_linear(x, y, weights)
+        np.testing.assert_allclose([a0[0], s0[0]], regression.players_linear_regression.loc[player], rtol = 1e-9)
+
+        a, b = bootstrap_quantile(x, y, weights)
+        expected_a, expected_b = quantile_regression(x, y, QUANTILES)
+        # Sur les données arrondies, une même droite passe par plusieurs couples de points : égalité aux arrondis près
+        np.testing.assert_allclose(a[0], expected_a, rtol = 1e-12)
+        np.testing.assert_allclose(b[0], expected_b, rtol = 1e-12, atol = 1e-12)
+        np.testing.assert_allclose(a[0], regression.players_quantile_regression.loc[player].a0, rtol = 1e-12)
+
+
+def test_large_groups_skip_the_quantile_intervals(high_intensity_points, monkeypatch):
+    monkeypatch.setattr(bootstrap, 'EXACT_MAX_POINTS', 100)
+    table, diagnostics = bootstrap_profiles(high_intensity_points, 20)
+    for player, points in high_intensity_points.groupby('Player') :
+        quantile = table.loc[player, ["a0 : Regression quantile low", "s0 : Regression quantile high"]]
+        assert diagnostics[player]['n_points'] == len(points)
+        if len(points) > 100 :
+            assert diagnostics[player]['quantile_engine'] is None and quantile.isna().all()
+        else :
+            assert diagnostics[player]['quantile_engine'] == 'exact' and quantile.notna().all()
+        assert table.loc[player, ["a0 : Regression linéaire low", "a0 : Regression linéaire high"]].notna().all()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from derivation import default_max_gap, derive_acceleration
+
+
+def timestamps(period : float, n : int, jitter : float = 0, seed : int = 0) -> np.ndarray:
+    """Horodatages (ns) d'un échantillonnage de période `period` s, avec une gigue uniforme de ± `jitter` s."""
+    rng = np.random.default_rng(seed)
+    return ((np.arange(n) * period + rng.uniform(- jitter, jitter, n)) * 1e9).astype(np.int64)
+
+
+def test_default_max_gap_follows_sampling_rate():
+    players = np.repeat(['a', 'b'], 50)
+    assert default_max_gap(players, np.concatenate([timestamps(.1, 50), timestamps(.1, 50)])) == 1.0
+    assert np.isclose(default_max_gap(players, np.concatenate([timestamps(2, 50), timestamps(2, 50)])), 6.0)
+    assert default_max_gap(np.array(['a']), timestamps(1, 1)) == 1.0
+
+
+def test_jittered_1hz_export_keeps_its_acceleration():
+    time = timestamps(1, 200, jitter = .1)
+    speed = np.linspace(0, 8, 200)
+    players = np.full(200, 'a')
+    assert np.isnan(derive_acceleration(speed, time, players)).sum() == 1
+    # Avec un trou maximal de 1 s, les intervalles de plus d'une seconde coupent la dérivée
+    assert np.isnan(derive_acceleration(speed, time, players, max_gap = 1.0)).sum() > 1
+
+
+def test_gaps_and_players_start_segments():
+    time = np.concatenate([timestamps(.1, 20), timestamps(.1, 20) + int(30e9), timestamps(.1, 20)])
+    players = np.repeat(['a', 'b'], [40, 20])
+    acceleration = derive_acceleration(np.arange(60.), time, players)
+    assert np.flatnonzero(np.isnan(acceleration)).tolist() == [0, 20, 40]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from loading import load_session, write_cache
+
+
+def comma_session(path : str) -> str:
+    """Export à virgule décimale et séparateur ';' d'une courte session de deux joueurs."""
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range('2023-03-01 10:00', periods = 200, freq = '100ms')
+    frame = pd.DataFrame({'Player' : np.repeat(['a', 'b'], 200), 'Timestamp' : np.tile(timestamps, 2),
+                          'Speed' : rng.uniform(0, 30, 400), 'Acceleration' : rng.normal(0, 2, 400)})
+    frame.to_csv(path, sep = ';', decimal = ',', index = False)
+    return path
+
+
+@pytest.mark.parametrize('keep_acceleration', [False, True])
+def test_comma_decimal_session_is_cached_as_floats(tmp_path, keep_acceleration):
+    path = comma_session(str(tmp_path / "session.csv"))
+    cache_dir = str(tmp_path / "cache")
+    parsed = load_session(path, sep = ';', convert_speed = True, keep_acceleration = keep_acceleration, cache_dir = cache_dir)
+    assert parsed.Speed.dtype == float and parsed.Acceleration.dtype == float
+
+    [entry] = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, entry, "meta.json")) as f :
+        kinds = {column['name'] : column['kind'] for column in json.load(f)['columns']}
+    assert kinds['Speed'] == kinds['Acceleration'] == 'numeric'
+
+    cached = load_session(path, sep = ';', convert_speed = True, keep_acceleration = keep_acceleration, cache_dir = cache_dir)
+    pd.testing.assert_frame_equal(cached, parsed, check_index_type = False)
+
+
+def test_cache_coerces_object_speed(tmp_path):
+    frame = pd.DataFrame({'Player' : ['a', 'b'], 'Speed' : pd.Series([1.5, 2.5], dtype = object), 'Acceleration' : [0., 1.]})
+    write_cache(frame, str(tmp_path / "entry"))
+    assert np.load(str(tmp_path / "entry" / "1.npy")).dtype == float
+    with pytest.raises(ValueError) :
+        write_cache(frame.assign(Speed = ['1,5', 'x']), str(tmp_path / "other"))
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+import pytest
+
+from pipeline import run
+from reference import profile_table, reference_profiles
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+
+@pytest.mark.parametrize('dbscan_engine', ['sklearn', 'grid'])
+def test_output_does_not_depend_on_workers(season, dbscan_engine):
+    params = {'dbscan_engine' : dbscan_engine}
+    serial, parallel = run(season, '', workers = 1, params = params), run(season, '', workers = 2, params = params)
+    pd.testing.assert_frame_equal(profile_table(parallel), profile_table(serial), check_exact = True)
+    pd.testing.assert_frame_equal(parallel.players_quantile_regression, serial.players_quantile_regression, check_exact = True)
+    # Même résultat que la chaîne série Outliers puis Regression
+    pd.testing.assert_frame_equal(profile_table(serial), reference_profiles(season, dbscan_engine = dbscan_engine), check_exact = True)
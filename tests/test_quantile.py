@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import regression
+from quantile import QUANTILES, quantile_regression
+from regression import Regression
+
+# Régressions de mauvaise qualité et limite d'itérations de statsmodels : warnings attendus
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+# Écart toléré entre les moyennes sur les quantiles des deux moteurs (m/s² pour a0, m/s pour s0)
+TOLERANCE = 0.01
+
+
+def check_loss(x : np.ndarray, y : np.ndarray, a : float, b : float, q : float) -> float:
+    """Perte de la régression quantile q de la droite y = a + b * x."""
+    residuals = y - (a + b * x)
+    return np.sum(np.where(residuals > 0, q * residuals, (q - 1) * residuals))
+
+
+def profiles(points : pd.DataFrame, engine : str) -> Regression:
+    model = Regression(points, quantile_engine = engine)
+    model.high_intensity_points = points
+    model.regression_quantile()
+    return model
+
+
+def test_exact_loss_never_above_statsmodels(high_intensity_points):
+    import statsmodels.formula.api as smf
+    for player, points in high_intensity_points.groupby('Player') :
+        x, y = points.Speed.to_numpy(), points.Acceleration.to_numpy()
+        a, b = quantile_regression(x, y, QUANTILES)
+        model = smf.quantreg('Acceleration ~ Speed', points)
+        for k, q in enumerate(QUANTILES) :
+            params = model.fit(q = q, max_iter = regression.MAX_ITER).params
+            exact, reference = check_loss(x, y, a[k], b[k], q), check_loss(x, y, params['Intercept'], params['Speed'], q)
+            assert exact <= reference + 1e-9 * max(1, reference), (player, q)
+
+
+def test_exact_matches_statsmodels_profiles(high_intensity_points):
+    exact = profiles(high_intensity_points, 'exact').compute_quantile_a0_s0()
+    reference = profiles(high_intensity_points, 'statsmodels').compute_quantile_a0_s0()
+    assert exact.index.equals(reference.index)
+    for column in ['a0 : Regression quantile', 's0 : Regression quantile'] :
+        np.testing.assert_allclose(exact[column], reference[column], rtol = 0, atol = TOLERANCE)
+
+
+def test_large_groups_fall_back_to_statsmodels(high_intensity_points, monkeypatch):
+    monkeypatch.setattr(regression, 'EXACT_MAX_POINTS', 100)
+    model = profiles(high_intensity_points, 'exact')
+    for player, points in high_intensity_points.groupby('Player') :
+        diagnostics = model.diagnostics['quantile_regression'][player]
+        assert diagnostics['n_points'] == len(points)
+        if len(points) > 100 :
+            assert diagnostics['engine'] == 'statsmodels' and diagnostics['requested_engine'] == 'exact'
+        else :
+            assert diagnostics['engine'] == 'exact'
+    assert any(diagnostics['engine'] == 'statsmodels' for diagnostics in model.diagnostics['quantile_regression'].values())
+
+
+def test_exact_without_distinct_speeds():
+    a, b = quantile_regression(np.full(5, 4.), np.arange(5.), QUANTILES)
+    assert np.isnan(a).all() and np.isnan(b).all()
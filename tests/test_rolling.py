@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+import pytest
+
+from reference import reference_profiles
+from rolling import RollingProfile
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+
+@pytest.mark.parametrize('window', [1, 2, 3])
+def test_each_window_matches_full_run(season, window):
+    series = RollingProfile(window).run(season)
+    dates = sorted(season.Date.unique())
+    for k, date in enumerate(dates) :
+        # Fenêtre des `window` dernières dates : les plus anciennes sont retirées, la date de mauvaise utilisation (3e) est vide
+        window_dates = dates[max(0, k + 1 - window):k + 1]
+        expected = reference_profiles(season[season.Date.isin(window_dates)])
+        if expected.empty :
+            assert date not in series.index.get_level_values('Date')
+            continue
+        rows = series.xs(date, level = 'Date')
+        assert (rows.Start == window_dates[0]).all() and (rows.n_sessions == len(window_dates)).all()
+        pd.testing.assert_frame_equal(rows[expected.columns], expected, check_exact = True, check_names = False)
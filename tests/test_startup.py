@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from benchmark.startup import BUDGET, SCENARIOS, startup
+
+# Budgets multipliés sur une machine lente (ex : STARTUP_BUDGET_SCALE=2)
+SCALE = float(os.environ.get('STARTUP_BUDGET_SCALE', 1))
+
+
+@pytest.fixture(scope = 'module')
+def results() -> dict:
+    return startup(repeat = 3)
+
+
+@pytest.mark.parametrize('name', SCENARIOS)
+def test_no_heavy_import_at_startup(results, name):
+    assert results[name]['heavy'] == []
+
+
+@pytest.mark.parametrize('name', SCENARIOS)
+def test_startup_within_budget(results, name):
+    assert results[name]['time'] <= BUDGET[name] * SCALE
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pandas as pd
+import pytest
+
+from reference import reference_regression
+from store import ProfileStore
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+
+@pytest.mark.parametrize('dbscan_engine', ['sklearn', 'grid'])
+def test_ingest_by_date_matches_full_run(season, tmp_path, monkeypatch, dbscan_engine):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("results")
+    reference_regression(season).save("full")
+
+    store = ProfileStore(str(tmp_path / "season"), dbscan_engine = dbscan_engine)
+    for date, points in season.groupby('Date') :
+        store.ingest(points, source = str(date))
+    # Une session déjà intégrée est ignorée
+    assert store.ingest(season[season.Date == season.Date.iloc[0]], source = str(season.Date.iloc[0])) == []
+
+    # Relecture du stock depuis le disque
+    ProfileStore(str(tmp_path / "season"), dbscan_engine = dbscan_engine).save("season")
+    with open("results/ProfilAV_insitu_season.csv") as store_csv, open("results/ProfilAV_insitu_full.csv") as full_csv :
+        assert store_csv.read() == full_csv.read()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dbscan import dbscan_noise
+from derivation import derive_acceleration
+from reference import reference_profiles
+from streaming import IncrementalDBSCAN, StreamingProfiler
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+
+def offline_profiles(received : pd.DataFrame, max_gap : float, smoothing : str) -> pd.DataFrame:
+    """Profils hors ligne (cf main.py) sur les échantillons reçus : dérivée par joueur, puis Outliers et Regression."""
+    received = received.sort_values(by = ['Player', 'Timestamp'], kind = 'stable')
+    received = received.assign(Acceleration = derive_acceleration(received.Speed.to_numpy(), pd.DatetimeIndex(received.Timestamp).asi8, received.Player.to_numpy(), max_gap = max_gap, smoothing = smoothing))
+    return reference_profiles(received)
+
+
+@pytest.mark.parametrize('smoothing', [None, 'exponential'])
+def test_profiles_equal_offline_run_after_each_cut(season, smoothing):
+    stream = season[['Player', 'Timestamp', 'Speed', 'Date']].sort_values(by = 'Timestamp', kind = 'stable', ignore_index = True)
+    profiler = StreamingProfiler(max_gap = 1.0, smoothing = smoothing)
+    # Coupures en cours de séance, dont après la date de mauvaise utilisation (3e jour) et en fin de flux
+    cuts = np.linspace(0, len(stream), 9).astype(int)[1:]
+    for start, stop in zip(np.r_[0, cuts[:-1]], cuts) :
+        profiler.update(stream.iloc[start:stop])
+        expected = offline_profiles(stream.iloc[:stop], 1.0, smoothing)
+        pd.testing.assert_frame_equal(profiler.profiles()[expected.columns], expected, check_names = False, rtol = 1e-9)
+    # Le filtre exponentiel atténue la salve de mauvaise utilisation : la date n'est signalée que sans lissage
+    assert len(profiler.misuse_dates) == (1 if smoothing is None else 0)
+
+
+@pytest.mark.parametrize('rounded', [False, True])
+def test_incremental_dbscan_matches_grid_with_removals(rounded):
+    rng = np.random.default_rng(4)
+    x = np.concatenate([rng.normal(5, .4, 300), rng.uniform(0, 10, 150)])
+    y = np.concatenate([rng.normal(3, .3, 300), rng.uniform(0, 10, 150)])
+    if rounded :
+        x, y = x.round(1), y.round(1)
+    order = rng.permutation(len(x))
+    x, y = x[order], y[order]
+
+    dbscan = IncrementalDBSCAN(eps = 0.5, min_samples = 3)
+    present = []
+
+    def check() :
+        expected = dbscan_noise(np.zeros(len(present)), x[present], y[present], 0.5, 3)
+        assert [dbscan.noise[point] for point in present] == expected.tolist()
+
+    for point in range(len(x)) :
+        dbscan.add(point, x[point], y[point])
+        present.append(point)
+        if point % 50 == 49 :
+            check()
+        # Retrait d'une partie des points (ex : date de mauvaise utilisation)
+        if point % 150 == 149 :
+            removed = rng.choice(present, size = len(present) // 3, replace = False).tolist()
+            before = {point : dbscan.noise[point] for point in present}
+            changed = dbscan.remove(removed)
+            present = [point for point in present if point not in set(removed)]
+            check()
+            assert changed == {point for point in present if dbscan.noise[point] != before[point]}
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+import pytest
+
+from reference import reference_profiles
+from sweep import DEFAULTS, expand_grid, sweep
+
+pytestmark = pytest.mark.filterwarnings('ignore')
+
+GRID = {'nb_outlier' : [5, 10], 'eps_DBSCAN' : [0.3, 0.5], 'dv' : [0.2, 0.3], 'n_max' : [1, 3], 'dbscan_engine' : 'grid'}
+
+
+@pytest.fixture(scope = 'module')
+def table(season) -> pd.DataFrame:
+    return sweep(season, GRID)
+
+
+def test_rows_match_single_configuration(season, table):
+    for k, rows in table.groupby('combination') :
+        params = rows.iloc[0][list(DEFAULTS)].to_dict()
+        expected = reference_profiles(season, **params)
+        profiles = rows.set_index('Player')[expected.columns]
+        pd.testing.assert_frame_equal(profiles, expected, check_exact = True, check_names = False)
+
+
+def test_workers_give_the_same_table(season, table):
+    pd.testing.assert_frame_equal(sweep(season, GRID, workers = 2), table, check_exact = True)
+
+
+def test_scalar_values():
+    assert expand_grid({'dv' : 0.3, 'n_max' : [1, 2]}) == expand_grid({'dv' : [0.3], 'n_max' : [1, 2]})
+    with pytest.raises(ValueError) :
+        expand_grid({'dv' : []})